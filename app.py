@@ -5,15 +5,85 @@ Visual Block Editor - A simple app for creating blocks with inputs/outputs and g
 
 import sys
 import os
+import io
 import json
 import uuid
-from typing import Dict, List, Tuple, Optional, Set, Any
-from dataclasses import dataclass, field, asdict
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Tuple, Optional, Set, Any, Sequence, Iterator
+from dataclasses import dataclass, field
 
 import tkinter as tk
-from tkinter import ttk, filedialog, simpledialog, messagebox
+# filedialog and messagebox are imported where they are used, as most sessions never need them
+from tkinter import ttk
 from tkinter import font as tkfont
 
+import fast_geom
+import fast_graph
+import fast_io
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+try:
+    import pyperclip
+except ImportError:  # pyperclip is optional; the Tk clipboard is used instead
+    pyperclip = None
+
+try:
+    import simdjson
+except ImportError:  # pysimdjson is optional; projects are then parsed with json_loads
+    simdjson = None
+
+# Sort graphs at least this large with the Numba kernel when it is installed;
+# for smaller graphs the call overhead outweighs the gain
+NUMBA_SORT_THRESHOLD = 512
+
+# IDs only have to be unique within a project, so a counter is enough; the per-session
+# token keeps new IDs from clashing with the IDs in previously saved projects
+_SESSION_TOKEN = uuid.uuid4().hex[:12]
+_id_counter = itertools.count()
+
+# Long text is put into Text widgets this many characters per idle callback
+TEXT_INSERT_CHUNK = 1 << 16
+
+# Text longer than this is copied with pyperclip (when installed) rather than through Tcl
+NATIVE_CLIPBOARD_THRESHOLD = 1 << 16
+
+# How long status bar messages stay up
+STATUS_TIMEOUT_MS = 3000
+
+
+def new_id(prefix: str) -> str:
+    """Create a unique ID for a port ("p"), block ("b") or connection ("c")."""
+    return f"{prefix}{_SESSION_TOKEN}-{next(_id_counter)}"
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_loads(data: Any) -> Any:
+    """Parse UTF-8 JSON from bytes or a memoryview, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _plain(value: Any) -> Any:
+    """Convert a lazily parsed simdjson object to plain Python data (dicts pass through)."""
+    as_dict = getattr(value, "as_dict", None)
+    return as_dict() if as_dict is not None else value
+
+
 # ======================= DATA MODELS =======================
 
 @dataclass
@@ -29,12 +99,23 @@ class Port:
     @classmethod
     def create_input(cls, name: str, data_type: str = "any"):
         """Factory method to create an input port."""
-        return cls(id=str(uuid.uuid4()), name=name, data_type=data_type, is_input=True)
+        return cls(id=new_id("p"), name=name, data_type=data_type, is_input=True)
     
     @classmethod
     def create_output(cls, name: str, data_type: str = "any"):
         """Factory method to create an output port."""
-        return cls(id=str(uuid.uuid4()), name=name, data_type=data_type, is_input=False)
+        return cls(id=new_id("p"), name=name, data_type=data_type, is_input=False)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the port to a JSON-serializable dict."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "data_type": self.data_type,
+            "position": self.position,
+            "is_input": self.is_input,
+            "connected_to": self.connected_to,
+        }
 
 
 @dataclass
@@ -51,55 +132,114 @@ class Block:
     outputs: List[Port] = field(default_factory=list)
     properties: Dict[str, Any] = field(default_factory=dict)
     
+    def __post_init__(self):
+        # Maps port IDs to ports (kept out of the dataclass fields so it isn't serialized)
+        self._port_index: Dict[str, Port] = {port.id: port for port in self.inputs + self.outputs}
+        
+        # Absolute port coordinates as parallel x/y arrays; _port_row maps port IDs to rows
+        self._port_row: Dict[str, int] = {}
+        self._port_abs_x: List[float] = []
+        self._port_abs_y: List[float] = []
+        self._rebuild_port_array()
+        
+        # Output of to_code() and the _code_key() it was generated for
+        self._code_cache: Optional[str] = None
+        self._code_cache_key: Optional[tuple] = None
+    
     def add_input(self, name: str, data_type: str = "any") -> Port:
         """Add an input port to the block."""
-        port = Port.create_input(name, data_type)
-        self.inputs.append(port)
+        port = self._append_port(Port.create_input(name, data_type))
         self._update_port_positions()
         return port
     
     def add_output(self, name: str, data_type: str = "any") -> Port:
         """Add an output port to the block."""
-        port = Port.create_output(name, data_type)
-        self.outputs.append(port)
+        port = self._append_port(Port.create_output(name, data_type))
+        self._update_port_positions()
+        return port
+    
+    def add_ports(self, inputs: Sequence[Tuple[str, str]] = (),
+                  outputs: Sequence[Tuple[str, str]] = ()) -> List[Port]:
+        """Add several (name, data_type) input and output ports, laying out the ports only once."""
+        ports = [self._append_port(Port.create_input(name, data_type)) for name, data_type in inputs]
+        ports += [self._append_port(Port.create_output(name, data_type)) for name, data_type in outputs]
         self._update_port_positions()
+        return ports
+    
+    def _append_port(self, port: Port) -> Port:
+        """Store a new port without updating the port layout (callers must lay out the ports)."""
+        (self.inputs if port.is_input else self.outputs).append(port)
+        self._port_index[port.id] = port
         return port
     
     def _update_port_positions(self):
         """Update the positions of all ports based on the block's dimensions."""
         # Position input ports on the left side
-        input_spacing = self.height / (len(self.inputs) + 1) if self.inputs else 0
-        for i, port in enumerate(self.inputs):
-            port.position = (0, (i + 1) * input_spacing)
+        for port, offset in zip(self.inputs, fast_geom.port_offsets(self.height, len(self.inputs))):
+            port.position = (0, offset)
         
         # Position output ports on the right side
-        output_spacing = self.height / (len(self.outputs) + 1) if self.outputs else 0
-        for i, port in enumerate(self.outputs):
-            port.position = (self.width, (i + 1) * output_spacing)
+        for port, offset in zip(self.outputs, fast_geom.port_offsets(self.height, len(self.outputs))):
+            port.position = (self.width, offset)
+        
+        self._rebuild_port_array()
+    
+    def _rebuild_port_array(self):
+        """Recompute the absolute coordinates of all ports."""
+        ports = self.inputs + self.outputs
+        self._port_row = {port.id: row for row, port in enumerate(ports)}
+        self._port_abs_x = [self.x + port.position[0] for port in ports]
+        self._port_abs_y = [self.y + port.position[1] for port in ports]
+    
+    def move(self, dx: float, dy: float):
+        """Move the block and its port coordinates by the given offset."""
+        self.x += dx
+        self.y += dy
+        self._port_abs_x = [x + dx for x in self._port_abs_x]
+        self._port_abs_y = [y + dy for y in self._port_abs_y]
+    
+    def get_port_xy(self, port_id: str) -> Optional[Tuple[float, float]]:
+        """Get the absolute canvas position of a port."""
+        row = self._port_row.get(port_id)
+        if row is None:
+            return None
+        return self._port_abs_x[row], self._port_abs_y[row]
     
     def get_port_by_id(self, port_id: str) -> Optional[Port]:
         """Find a port by its ID."""
-        for port in self.inputs + self.outputs:
-            if port.id == port_id:
-                return port
-        return None
+        return self._port_index.get(port_id)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the block to a JSON-serializable dict."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "block_type": self.block_type,
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+            "inputs": [port.to_dict() for port in self.inputs],
+            "outputs": [port.to_dict() for port in self.outputs],
+            "properties": dict(self.properties),
+        }
+    
+    def _code_key(self) -> tuple:
+        """Everything to_code() depends on; the cached code is reused while this is unchanged."""
+        return (self.block_type, self.name, tuple(self.properties.items()),
+                tuple(port.name for port in self.inputs), tuple(port.name for port in self.outputs))
     
     def to_code(self) -> str:
-        """Generate code representation of this block."""
-        if self.block_type == "input_value":
-            return f"{self.name} = {self.properties.get('default_value', '0')}"
-        elif self.block_type == "output_value":
-            return f"# Output: {self.name}"
-        elif self.block_type == "operation":
-            op = self.properties.get("operation", "+")
-            # This is simplified; in reality would need to handle connections
-            return f"result = input1 {op} input2"
-        elif self.block_type == "function":
-            func_name = self.properties.get("function_name", "my_function")
-            params = ", ".join([inp.name for inp in self.inputs])
-            return f"def {func_name}({params}):\n    return {self.outputs[0].name if self.outputs else 'None'}"
-        else:
-            return f"# Block: {self.name}"
+        """Generate code representation of this block (cached while the block is unchanged)."""
+        key = self._code_key()
+        if self._code_cache is None or key != self._code_cache_key:
+            self._code_cache = self._generate_code()
+            self._code_cache_key = key
+        return self._code_cache
+    
+    def _generate_code(self) -> str:
+        """Build the code for this block with the emitter for its type."""
+        return CODE_EMITTERS.get(self.block_type, _emit_generic)(self)
 
 
 @dataclass
@@ -115,6 +255,16 @@ class Connection:
     def key(self) -> Tuple[str, str]:
         """Returns a unique key for this connection."""
         return (self.source_port_id, self.target_port_id)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the connection to a JSON-serializable dict."""
+        return {
+            "id": self.id,
+            "source_block_id": self.source_block_id,
+            "source_port_id": self.source_port_id,
+            "target_block_id": self.target_block_id,
+            "target_port_id": self.target_port_id,
+        }
 
 
 @dataclass
@@ -122,25 +272,62 @@ class BlockCanvas:
     """Represents the canvas containing blocks and connections."""
     blocks: Dict[str, Block] = field(default_factory=dict)
     connections: Dict[str, Connection] = field(default_factory=dict)
+    # Maps block IDs to the IDs of the connections touching that block
+    block_connections: Dict[str, Set[str]] = field(default_factory=dict)
+    # Maps port IDs to the ID of the block that owns the port
+    port_to_block: Dict[str, str] = field(default_factory=dict)
+    
+    def __post_init__(self):
+        # Output of generate_code() and its UTF-8 encoding, cleared by invalidate_code()
+        self._code_cache: Optional[str] = None
+        self._code_bytes_cache: Optional[bytes] = None
+    
+    def invalidate_code(self) -> None:
+        """Drop the cached generate_code() output; call after editing a block's name, properties or ports."""
+        self._code_cache = None
+        self._code_bytes_cache = None
     
     def add_block(self, block: Block) -> None:
         """Add a block to the canvas."""
         self.blocks[block.id] = block
+        self.block_connections.setdefault(block.id, set())
+        self.index_ports(block)
+        self.invalidate_code()
+    
+    def index_ports(self, block: Block) -> None:
+        """Record the owning block of each of the block's ports (call again after adding ports)."""
+        for port in block.inputs + block.outputs:
+            self.port_to_block[port.id] = block.id
+    
+    def get_block_connections(self, block_id: str) -> List[Connection]:
+        """Get all connections attached to a block."""
+        return [self.connections[cid] for cid in self.block_connections.get(block_id, ())]
+    
+    def _index_connection(self, conn: Connection) -> None:
+        """Record a connection in the block adjacency index."""
+        self.block_connections.setdefault(conn.source_block_id, set()).add(conn.id)
+        self.block_connections.setdefault(conn.target_block_id, set()).add(conn.id)
+    
+    def _unindex_connection(self, conn: Connection) -> None:
+        """Drop a connection from the block adjacency index."""
+        for block_id in (conn.source_block_id, conn.target_block_id):
+            conn_ids = self.block_connections.get(block_id)
+            if conn_ids is not None:
+                conn_ids.discard(conn.id)
     
     def remove_block(self, block_id: str) -> None:
         """Remove a block and its connections from the canvas."""
         if block_id in self.blocks:
             # Remove any connections involving this block
-            conn_to_remove = []
-            for conn_id, conn in self.connections.items():
-                if conn.source_block_id == block_id or conn.target_block_id == block_id:
-                    conn_to_remove.append(conn_id)
-            
-            for conn_id in conn_to_remove:
-                del self.connections[conn_id]
+            for conn_id in list(self.block_connections.get(block_id, ())):
+                self.disconnect_ports(conn_id)
             
             # Remove the block
-            del self.blocks[block_id]
+            block = self.blocks.pop(block_id)
+            self.block_connections.pop(block_id, None)
+            for port in block.inputs + block.outputs:
+                self.port_to_block.pop(port.id, None)
+            self.invalidate_code()
     
     def connect_ports(self, source_block_id: str, source_port_id: str, 
                       target_block_id: str, target_port_id: str) -> Optional[Connection]:
@@ -168,7 +355,7 @@ class BlockCanvas:
         
         # Create and store the connection
         conn = Connection(
-            id=str(uuid.uuid4()),
+            id=new_id("c"),
             source_block_id=source_block_id,
             source_port_id=source_port_id,
             target_block_id=target_block_id,
@@ -179,6 +366,8 @@ class BlockCanvas:
         target_port.connected_to = source_port_id
         
         self.connections[conn.id] = conn
+        self._index_connection(conn)
+        self.invalidate_code()
         return conn
     
     def disconnect_ports(self, conn_id: str) -> None:
@@ -194,47 +383,132 @@ class BlockCanvas:
                     target_port.connected_to = None
             
             # Remove the connection
+            self._unindex_connection(conn)
             del self.connections[conn_id]
+            self.invalidate_code()
     
     def generate_code(self) -> str:
-        """Generate code from the blocks and connections."""
+        """Generate code from the blocks and connections (cached until the canvas changes)."""
+        if self._code_cache is None:
+            self._code_cache = self._generate_code()
+        return self._code_cache
+    
+    def generate_code_bytes(self) -> bytes:
+        """Get generate_code() encoded as UTF-8, encoding it only once per change."""
+        if self._code_bytes_cache is None:
+            self._code_bytes_cache = self.generate_code().encode('utf-8')
+        return self._code_bytes_cache
+    
+    def _generate_code(self) -> str:
+        """Build the code for the whole canvas."""
         # This is a simplified implementation
-        code_lines = ["# Generated Code", ""]
+        buf = io.StringIO()
+        buf.write("# Generated Code\n")
         
-        # Sort blocks to handle dependencies (very simple approach)
-        # In a real implementation, you'd want topological sorting
-        blocks_list = list(self.blocks.values())
-        blocks_list.sort(key=lambda b: 0 if b.block_type == "input_value" else 
-                                      (1 if b.block_type == "operation" else 2))
+        # Generate code for each block, after the blocks it depends on
+        for block in self.iter_topological_order():
+            buf.write("\n")
+            buf.write(block.to_code())
         
-        # Generate code for each block
-        for block in blocks_list:
-            code_lines.append(block.to_code())
-        
-        return "\n".join(code_lines)
+        return buf.getvalue()
+    
+    def topological_order(self) -> List[Block]:
+        """Order the blocks so each block comes after the blocks connected to its inputs."""
+        return list(self.iter_topological_order())
+    
+    def iter_topological_order(self) -> Iterator[Block]:
+        """Yield the blocks so each block comes after the blocks connected to its inputs.
+        
+        Blocks in a cycle never become ready; they are yielded last, in insertion order.
+        """
+        if fast_graph.NUMBA_AVAILABLE and len(self.blocks) >= NUMBA_SORT_THRESHOLD:
+            return self._kahn_order_numba()
+        return self._kahn_order()
+    
+    def _kahn_order(self) -> Iterator[Block]:
+        """Kahn's algorithm over the connections."""
+        # Successors are collected in connection order so the output is stable between runs
+        indegree = dict.fromkeys(self.blocks, 0)
+        successors: Dict[str, List[str]] = {block_id: [] for block_id in self.blocks}
+        for conn in self.connections.values():
+            if conn.source_block_id in successors and conn.target_block_id in indegree:
+                successors[conn.source_block_id].append(conn.target_block_id)
+                indegree[conn.target_block_id] += 1
+        
+        ready = deque(block_id for block_id, degree in indegree.items() if degree == 0)
+        while ready:
+            block_id = ready.popleft()
+            yield self.blocks[block_id]
+            for target_id in successors[block_id]:
+                indegree[target_id] -= 1
+                if indegree[target_id] == 0:
+                    ready.append(target_id)
+        
+        # Anything left with inputs pending is part of (or fed by) a cycle
+        for block_id, degree in indegree.items():
+            if degree > 0:
+                yield self.blocks[block_id]
+    
+    def _kahn_order_numba(self) -> Iterator[Block]:
+        """Same as _kahn_order, using the compiled kernel on contiguous block indices."""
+        blocks = list(self.blocks.values())
+        index = {block.id: i for i, block in enumerate(blocks)}
+        edges = [
+            (index[conn.source_block_id], index[conn.target_block_id])
+            for conn in self.connections.values()
+            if conn.source_block_id in index and conn.target_block_id in index
+        ]
+        order = fast_graph.kahn_order(len(blocks), edges)
+        for i in order:
+            yield blocks[i]
+        
+        if len(order) < len(blocks):
+            sorted_indices = set(order)
+            for i, block in enumerate(blocks):
+                if i not in sorted_indices:
+                    yield block
     
     def save_to_json(self, filename: str) -> None:
         """Save the current canvas to a JSON file."""
-        data = {
-            "blocks": {bid: asdict(block) for bid, block in self.blocks.items()},
-            "connections": {cid: asdict(conn) for cid, conn in self.connections.items()}
-        }
-        
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        fast_io.write_chunks(filename, self.iter_json_chunks(), compress=True)
+    
+    def iter_json_chunks(self) -> Iterator[bytes]:
+        """Yield the project file as UTF-8 JSON, one object (one line) at a time."""
+        yield b'{\n  "blocks": {'
+        yield from self._iter_json_members(self.blocks)
+        yield b'},\n  "connections": {'
+        yield from self._iter_json_members(self.connections)
+        yield b'}\n}\n'
+    
+    @staticmethod
+    def _iter_json_members(objects: Dict[str, Any]) -> Iterator[bytes]:
+        """Yield the "id": {...} members of a JSON object, one line each."""
+        separator = b"\n    "
+        for obj_id, obj in objects.items():
+            yield separator + json_dumps(obj_id) + b": " + json_dumps(obj.to_dict())
+            separator = b",\n    "
+        if objects:
+            yield b"\n  "
     
     @classmethod
     def load_from_json(cls, filename: str) -> 'BlockCanvas':
         """Load a canvas from a JSON file."""
-        with open(filename, 'r') as f:
-            data = json.load(f)
-        
+        # Uncompressed files are parsed straight from the mapped file instead of a copy of it
+        with fast_io.read_data(filename) as view:
+            if simdjson is not None:
+                # Parsed lazily: fields become Python objects only as from_dict() reads them
+                return cls.from_dict(simdjson.Parser().parse(view))
+            return cls.from_dict(json_loads(view))
+    
+    @classmethod
+    def from_dict(cls, data: Any) -> 'BlockCanvas':
+        """Build a canvas from parsed project data (a dict or a simdjson document)."""
         canvas = cls()
         
         # Reconstruct blocks
         for bid, block_data in data["blocks"].items():
-            inputs = [Port(**p) for p in block_data["inputs"]]
-            outputs = [Port(**p) for p in block_data["outputs"]]
+            inputs = [Port(**_plain(p)) for p in block_data["inputs"]]
+            outputs = [Port(**_plain(p)) for p in block_data["outputs"]]
             
             block = Block(
                 id=block_data["id"],
@@ -246,9 +520,9 @@ class BlockCanvas:
                 height=block_data["height"],
                 inputs=inputs,
                 outputs=outputs,
-                properties=block_data["properties"]
+                properties=_plain(block_data["properties"])
             )
-            canvas.blocks[bid] = block
+            canvas.add_block(block)
         
         # Reconstruct connections
         for cid, conn_data in data["connections"].items():
@@ -260,6 +534,7 @@ class BlockCanvas:
                 target_port_id=conn_data["target_port_id"]
             )
             canvas.connections[cid] = conn
+            canvas._index_connection(conn)
             
             # Update port connections
             target_block = canvas.blocks.get(conn.target_block_id)
@@ -271,6 +546,42 @@ class BlockCanvas:
         return canvas
 
 
+# ======================= CODE EMITTERS =======================
+# One function per block type, looked up once per block instead of testing each type in turn
+
+def _emit_input_value(block: Block) -> str:
+    return f"{block.name} = {block.properties.get('default_value', '0')}"
+
+
+def _emit_output_value(block: Block) -> str:
+    return f"# Output: {block.name}"
+
+
+def _emit_operation(block: Block) -> str:
+    op = block.properties.get("operation", "+")
+    # This is simplified; in reality would need to handle connections
+    return f"result = input1 {op} input2"
+
+
+def _emit_function(block: Block) -> str:
+    func_name = block.properties.get("function_name", "my_function")
+    params = ", ".join([inp.name for inp in block.inputs])
+    return f"def {func_name}({params}):\n    return {block.outputs[0].name if block.outputs else 'None'}"
+
+
+def _emit_generic(block: Block) -> str:
+    return f"# Block: {block.name}"
+
+
+# Maps block types to the function that generates their code; other types get _emit_generic
+CODE_EMITTERS: Dict[str, Callable[[Block], str]] = {
+    "input_value": _emit_input_value,
+    "output_value": _emit_output_value,
+    "operation": _emit_operation,
+    "function": _emit_function,
+}
+
+
 # ======================= UI COMPONENTS =======================
 
 class VisualBlockEditor(tk.Tk):
@@ -283,6 +594,8 @@ class VisualBlockEditor(tk.Tk):
         self.geometry("1200x800")
         
         self.canvas_model = BlockCanvas()
+        # File the project was opened from or last saved to; Save writes here without asking
+        self.current_path: Optional[str] = None
         self.selected_block: Optional[str] = None
         self.dragging = False
         self.drag_start_x = 0
@@ -291,6 +604,36 @@ class VisualBlockEditor(tk.Tk):
         # For connection drawing
         self.connection_start = None
         self.temp_connection_line = None
+        self._conn_source_xy: Optional[Tuple[float, float]] = None
+        
+        # Drag motion waiting to be applied by the idle callback
+        self._redraw_pending = False
+        self._pending_dx = 0
+        self._pending_dy = 0
+        self._pending_pointer: Optional[Tuple[int, int]] = None
+        self._resize_redraw_pending = False
+        
+        # Canvas item IDs, so existing items can be moved instead of redrawn
+        self.item_ids: Dict[str, Dict[str, Any]] = {}  # Maps block IDs to their canvas items
+        self.connection_item: Dict[str, int] = {}  # Maps connection IDs to line items
+        self.item_to_block: Dict[int, str] = {}  # Maps block canvas items to block IDs
+        self.item_to_input_port: Dict[int, str] = {}  # Maps input port ovals to port IDs
+        
+        # Fonts are Tcl objects, so create them once rather than per draw
+        self.title_font = tkfont.Font(family="Arial", size=10, weight="bold")
+        
+        # Pending after() callback that clears the status bar
+        self._status_clear_id: Optional[str] = None
+        # With VBE_SILENT set (scripted runs, benchmarks) no modal message boxes are shown
+        self._silent = bool(os.environ.get("VBE_SILENT"))
+        
+        # Generated Code dialog, kept (hidden) between uses, and the code it shows
+        self._code_dialog: Optional[tk.Toplevel] = None
+        self._code_text: Optional[tk.Text] = None
+        self._shown_code = ""
+        self._shown_code_bytes = b""
+        # Pending insert_text_chunked callbacks, by Text widget path
+        self._text_insert_jobs: Dict[str, str] = {}
         
         self.setup_ui()
     
@@ -306,8 +649,13 @@ class VisualBlockEditor(tk.Tk):
         ttk.Button(self.toolbar, text="New", command=self.new_project).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(self.toolbar, text="Open", command=self.open_project).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(self.toolbar, text="Save", command=self.save_project).pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(self.toolbar, text="Save As", command=self.save_project_as).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(self.toolbar, text="Generate Code", command=self.show_generated_code).pack(side=tk.LEFT, padx=5, pady=5)
         
+        # Status bar for success messages (packed before the sidebar so it spans the window)
+        self.status_bar = ttk.Label(self.main_frame, text="", anchor=tk.W, padding=(5, 2))
+        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        
         # Sidebar for block types
         self.sidebar = ttk.Frame(self.main_frame, width=200)
         self.sidebar.pack(side=tk.LEFT, fill=tk.Y, padx=5, pady=5)
@@ -338,6 +686,7 @@ class VisualBlockEditor(tk.Tk):
         self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
         self.canvas.bind("<Delete>", self.delete_selected)
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
         
         # Right-click context menu
         self.context_menu = tk.Menu(self.canvas, tearoff=0)
@@ -345,10 +694,12 @@ class VisualBlockEditor(tk.Tk):
         self.context_menu.add_command(label="Delete Block", command=self.delete_selected)
         
         self.canvas.bind("<ButtonPress-3>", self.show_context_menu)
+        
+        self.bind("<Control-s>", lambda event: self.save_project())
     
     def add_new_block(self, block_type: str, name: str):
         """Add a new block to the canvas."""
-        block_id = str(uuid.uuid4())
+        block_id = new_id("b")
         
         # Default position in the center of the visible canvas
         x = self.canvas.winfo_width() // 2
@@ -363,13 +714,11 @@ class VisualBlockEditor(tk.Tk):
         elif block_type == "output_value":
             block.add_input("value", "any")
         elif block_type == "operation":
-            block.add_input("input1", "number")
-            block.add_input("input2", "number")
-            block.add_output("result", "number")
+            block.add_ports(inputs=[("input1", "number"), ("input2", "number")],
+                            outputs=[("result", "number")])
             block.properties["operation"] = "+"
         elif block_type == "function":
-            block.add_input("param1", "any")
-            block.add_output("return_value", "any")
+            block.add_ports(inputs=[("param1", "any")], outputs=[("return_value", "any")])
             block.properties["function_name"] = "my_function"
         
         # Add the block to the model
@@ -384,28 +733,33 @@ class VisualBlockEditor(tk.Tk):
         rect_id = self.canvas.create_rectangle(
             block.x, block.y,
             block.x + block.width, block.y + block.height,
-            fill="lightblue", outline="black", tags=(f"block:{block.id}", "block")
+            fill="lightblue",
+            outline="red" if block.id == self.selected_block else "black",
+            width=2 if block.id == self.selected_block else 1,
+            tags=(f"block:{block.id}", "block")
         )
         
         # Draw the block title
-        self.canvas.create_text(
+        title_id = self.canvas.create_text(
             block.x + block.width//2, block.y + 15,
             text=block.name,
             fill="black",
-            font=tkfont.Font(family="Arial", size=10, weight="bold"),
+            font=self.title_font,
             tags=(f"block:{block.id}", "block")
         )
         
+        port_ovals = {}
+        port_labels = {}
+        
         # Draw input ports
         for port in block.inputs:
-            port_x = block.x + port.position[0]
-            port_y = block.y + port.position[1]
-            self.canvas.create_oval(
+            port_x, port_y = block.get_port_xy(port.id)
+            port_ovals[port.id] = self.canvas.create_oval(
                 port_x - 5, port_y - 5,
                 port_x + 5, port_y + 5,
                 fill="red", tags=(f"port:{port.id}", f"block:{block.id}", "port", "input_port")
             )
-            self.canvas.create_text(
+            port_labels[port.id] = self.canvas.create_text(
                 port_x + 20, port_y,
                 text=port.name,
                 fill="black",
@@ -415,59 +769,162 @@ class VisualBlockEditor(tk.Tk):
         
         # Draw output ports
         for port in block.outputs:
-            port_x = block.x + port.position[0]
-            port_y = block.y + port.position[1]
-            self.canvas.create_oval(
+            port_x, port_y = block.get_port_xy(port.id)
+            port_ovals[port.id] = self.canvas.create_oval(
                 port_x - 5, port_y - 5,
                 port_x + 5, port_y + 5,
                 fill="green", tags=(f"port:{port.id}", f"block:{block.id}", "port", "output_port")
             )
-            self.canvas.create_text(
+            port_labels[port.id] = self.canvas.create_text(
                 port_x - 20, port_y,
                 text=port.name,
                 fill="black",
                 anchor=tk.E,
                 tags=(f"block:{block.id}", "block")
             )
+        
+        self.item_ids[block.id] = {
+            "rect": rect_id,
+            "title": title_id,
+            "port_ovals": port_ovals,
+            "port_labels": port_labels,
+        }
+        
+        # Reverse lookups used for hit-testing without parsing tags
+        for item in (rect_id, title_id, *port_ovals.values(), *port_labels.values()):
+            self.item_to_block[item] = block.id
+        for port in block.inputs:
+            self.item_to_input_port[port_ovals[port.id]] = port.id
     
-    def draw_connection(self, conn: Connection):
-        """Draw a connection between ports."""
+    def _connection_coords(self, conn: Connection) -> Optional[Tuple[float, float, float, float]]:
+        """Get the (source_x, source_y, target_x, target_y) endpoints of a connection."""
         source_block = self.canvas_model.blocks.get(conn.source_block_id)
         target_block = self.canvas_model.blocks.get(conn.target_block_id)
         
         if not (source_block and target_block):
-            return
+            return None
         
-        source_port = source_block.get_port_by_id(conn.source_port_id)
-        target_port = target_block.get_port_by_id(conn.target_port_id)
+        source_xy = source_block.get_port_xy(conn.source_port_id)
+        target_xy = target_block.get_port_xy(conn.target_port_id)
         
-        if not (source_port and target_port):
-            return
+        if not (source_xy and target_xy):
+            return None
         
-        # Calculate port positions
-        source_x = source_block.x + source_port.position[0]
-        source_y = source_block.y + source_port.position[1]
-        target_x = target_block.x + target_port.position[0]
-        target_y = target_block.y + target_port.position[1]
+        return (*source_xy, *target_xy)
+    
+    def draw_connection(self, conn: Connection):
+        """Draw a connection between ports."""
+        coords = self._connection_coords(conn)
+        if not coords:
+            return
         
         # Draw the connection line
-        self.canvas.create_line(
-            source_x, source_y, target_x, target_y,
+        self.connection_item[conn.id] = self.canvas.create_line(
+            *coords,
             fill="black", width=2, smooth=True,
             tags=(f"connection:{conn.id}", "connection")
         )
     
+    def update_block_connections(self, block_id: str):
+        """Move the connection lines attached to a block to follow its ports."""
+        for conn in self.canvas_model.get_block_connections(block_id):
+            item = self.connection_item.get(conn.id)
+            coords = self._connection_coords(conn)
+            if item is not None and coords:
+                self.canvas.coords(item, *coords)
+    
     def redraw_canvas(self):
-        """Redraw all elements on the canvas."""
+        """Redraw the visible blocks and bring the connection lines up to date."""
+        self.canvas.delete("block", "port", "temp_connection")
+        self.item_ids = {}
+        self.item_to_block = {}
+        self.item_to_input_port = {}
+        self.temp_connection_line = None
+        
+        # Draw the blocks inside the visible area
+        blocks = list(self.canvas_model.blocks.values())
+        view = self._visible_region()
+        if view is None:
+            visible = [True] * len(blocks)
+        else:
+            visible = fast_geom.visible_mask(
+                [block.x for block in blocks], [block.y for block in blocks],
+                [block.width for block in blocks], [block.height for block in blocks], view
+            )
+        for block, is_visible in zip(blocks, visible):
+            if is_visible:
+                self.draw_block(block)
+        
+        # Connection lines are kept and moved rather than recreated
+        self.sync_connections()
+    
+    def set_model(self, canvas_model: BlockCanvas):
+        """Replace the whole project, e.g. after New or Open, and draw it from scratch."""
+        self.canvas_model = canvas_model
+        self.selected_block = None
+        
+        # None of the old items are reused, so drop them all in one call instead of
+        # letting sync_connections delete the old lines one at a time
         self.canvas.delete("all")
+        self.connection_item = {}
+        self.redraw_canvas()
+    
+    def sync_connections(self):
+        """Move existing connection lines, draw new ones and delete ones no longer needed."""
+        connections = self.canvas_model.connections
+        for conn_id in [cid for cid in self.connection_item if cid not in connections]:
+            self.canvas.delete(self.connection_item.pop(conn_id))
+        
+        drawable = []
+        for conn in connections.values():
+            coords = self._connection_coords(conn)
+            if coords:
+                drawable.append((conn, coords))
+            elif conn.id in self.connection_item:
+                self.canvas.delete(self.connection_item.pop(conn.id))
+        
+        # Drop lines that can't be seen (bounding box outside the view)
+        view = self._visible_region()
+        if view is None or not drawable:
+            visible = [True] * len(drawable)
+        else:
+            x0s, y0s, x1s, y1s = zip(*(coords for _, coords in drawable))
+            visible = fast_geom.segments_visible(x0s, y0s, x1s, y1s, view)
+        
+        for (conn, coords), is_visible in zip(drawable, visible):
+            item = self.connection_item.get(conn.id)
+            if not is_visible:
+                if item is not None:
+                    self.canvas.delete(self.connection_item.pop(conn.id))
+            elif item is None:
+                self.draw_connection(conn)
+            else:
+                self.canvas.coords(item, *coords)
         
-        # Draw all blocks
-        for block in self.canvas_model.blocks.values():
-            self.draw_block(block)
+        # Keep the lines above the blocks, as if they had been drawn last
+        self.canvas.tag_raise("connection")
+    
+    def _visible_region(self) -> Optional[Tuple[float, float, float, float]]:
+        """Get the visible area in canvas coordinates, or None if the canvas isn't laid out yet."""
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            return None
         
-        # Draw all connections
-        for conn in self.canvas_model.connections.values():
-            self.draw_connection(conn)
+        x0 = self.canvas.canvasx(0)
+        y0 = self.canvas.canvasy(0)
+        return (x0, y0, x0 + width, y0 + height)
+    
+    def _on_canvas_configure(self, event):
+        """Redraw once the canvas has been resized, since more blocks may now be visible."""
+        if not self._resize_redraw_pending:
+            self._resize_redraw_pending = True
+            self.after_idle(self._flush_resize_redraw)
+    
+    def _flush_resize_redraw(self):
+        """Apply a redraw requested by _on_canvas_configure."""
+        self._resize_redraw_pending = False
+        self.redraw_canvas()
     
     def on_canvas_click(self, event):
         """Handle mouse click on the canvas."""
@@ -490,119 +947,145 @@ class VisualBlockEditor(tk.Tk):
                     return
         
         # If we clicked on empty space, clear selection
-        self.selected_block = None
-        self.redraw_canvas()
+        self.select_block(None)
     
     def on_canvas_drag(self, event):
         """Handle mouse drag on the canvas."""
         if self.dragging and self.selected_block:
-            # Move the selected block
-            dx = event.x - self.drag_start_x
-            dy = event.y - self.drag_start_y
-            
-            block = self.canvas_model.blocks.get(self.selected_block)
-            if block:
-                block.x += dx
-                block.y += dy
-                
-                # Update port positions
-                block._update_port_positions()
-                
-                # Redraw everything
-                self.redraw_canvas()
+            # Accumulate the movement; it is applied once Tk is idle
+            self._pending_dx += event.x - self.drag_start_x
+            self._pending_dy += event.y - self.drag_start_y
             
             self.drag_start_x = event.x
             self.drag_start_y = event.y
+            self._schedule_drag_flush()
         elif self.connection_start:
-            # Draw temporary connection line
-            if self.temp_connection_line:
-                self.canvas.delete(self.temp_connection_line)
+            self._pending_pointer = (event.x, event.y)
+            self._schedule_drag_flush()
+    
+    def _schedule_drag_flush(self):
+        """Schedule a single drag update, coalescing motion events that arrive before it runs."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._flush_drag)
+    
+    def _flush_drag(self):
+        """Apply the drag motion accumulated since the last flush."""
+        if not self._redraw_pending:
+            return
+        self._redraw_pending = False
+        
+        if self.dragging and self.selected_block:
+            # Move the selected block
+            dx, dy = self._pending_dx, self._pending_dy
+            self._pending_dx = self._pending_dy = 0
             
-            # Find the starting port position
-            source_port_id = self.connection_start
-            source_block_id = None
-            for block_id, block in self.canvas_model.blocks.items():
-                for port in block.outputs:
-                    if port.id == source_port_id:
-                        source_block_id = block_id
-                        source_x = block.x + port.position[0]
-                        source_y = block.y + port.position[1]
-                        break
-                if source_block_id:
-                    break
+            block = self.canvas_model.blocks.get(self.selected_block)
+            if block and (dx or dy):
+                # Port positions are relative to the block, so they don't need a new layout
+                block.move(dx, dy)
+                
+                # Move the block's items and its attached connections only
+                self.canvas.move(f"block:{block.id}", dx, dy)
+                self.update_block_connections(block.id)
+        elif self.connection_start and self._pending_pointer and self._conn_source_xy:
+            coords = (*self._conn_source_xy, *self._pending_pointer)
             
-            if source_block_id:
+            # Draw the temporary connection line once, then just move its end
+            if self.temp_connection_line:
+                self.canvas.coords(self.temp_connection_line, *coords)
+            else:
                 self.temp_connection_line = self.canvas.create_line(
-                    source_x, source_y, event.x, event.y,
+                    *coords,
                     fill="gray", width=2, dash=(4, 4),
                     tags=("temp_connection")
                 )
     
     def on_canvas_release(self, event):
         """Handle mouse release on the canvas."""
+        # Apply any motion still waiting for the idle callback
+        self._flush_drag()
+        self._pending_pointer = None
+        
         if self.dragging:
             self.dragging = False
         elif self.connection_start:
             # Check if we released on an input port
             items = self.canvas.find_overlapping(event.x-5, event.y-5, event.x+5, event.y+5)
-            target_port_id = None
-            target_block_id = None
+            target_port_id = next(
+                (self.item_to_input_port[item] for item in reversed(items) if item in self.item_to_input_port),
+                None
+            )
             
-            for item in items:
-                tags = self.canvas.gettags(item)
-                for tag in tags:
-                    if tag.startswith("port:") and "input_port" in tags:
-                        target_port_id = tag.split(":", 1)[1]
-                    elif tag.startswith("block:"):
-                        target_block_id = tag.split(":", 1)[1]
+            port_to_block = self.canvas_model.port_to_block
+            target_block_id = port_to_block.get(target_port_id)
+            source_block_id = port_to_block.get(self.connection_start)
             
-            if target_port_id and target_block_id:
-                # Find the source block ID
-                source_block_id = None
-                for block_id, block in self.canvas_model.blocks.items():
-                    for port in block.outputs:
-                        if port.id == self.connection_start:
-                            source_block_id = block_id
-                            break
-                    if source_block_id:
-                        break
-                
-                if source_block_id:
-                    # Create the connection
-                    self.canvas_model.connect_ports(
-                        source_block_id, self.connection_start,
-                        target_block_id, target_port_id
-                    )
-                    self.redraw_canvas()
+            if target_block_id and source_block_id:
+                # Create the connection
+                conn = self.canvas_model.connect_ports(
+                    source_block_id, self.connection_start,
+                    target_block_id, target_port_id
+                )
+                if conn:
+                    self.draw_connection(conn)
             
             # Clean up the temporary connection
             if self.temp_connection_line:
                 self.canvas.delete(self.temp_connection_line)
                 self.temp_connection_line = None
             self.connection_start = None
+            self._conn_source_xy = None
     
-    def select_block(self, block_id: str):
-        """Select a block and highlight it."""
-        self.selected_block = block_id
-        self.redraw_canvas()
+    def select_block(self, block_id: Optional[str]):
+        """Select a block (or clear the selection with None) and highlight it."""
+        if self.selected_block and self.selected_block != block_id:
+            self._highlight_block(self.selected_block, False)
         
-        # Highlight the selected block
-        if block_id in self.canvas_model.blocks:
-            items = self.canvas.find_withtag(f"block:{block_id}")
-            for item in items:
-                if "oval" not in str(item):  # Don't change port colors
-                    self.canvas.itemconfig(item, outline="red", width=2)
+        self.selected_block = block_id
+        if block_id:
+            self._highlight_block(block_id, True)
+    
+    def _highlight_block(self, block_id: str, selected: bool):
+        """Set the outline of a drawn block to show whether it is selected."""
+        items = self.item_ids.get(block_id)
+        if items:
+            self.canvas.itemconfig(items["rect"], outline="red" if selected else "black",
+                                   width=2 if selected else 1)
     
     def start_connection(self, port_id: str):
         """Start drawing a connection from an output port."""
         self.connection_start = port_id
+        
+        # Find the starting port position once for the whole drag
+        self._conn_source_xy = None
+        block = self.canvas_model.blocks.get(self.canvas_model.port_to_block.get(port_id))
+        if block:
+            self._conn_source_xy = block.get_port_xy(port_id)
     
     def delete_selected(self, event=None):
         """Delete the currently selected block."""
         if self.selected_block:
-            self.canvas_model.remove_block(self.selected_block)
+            block_id = self.selected_block
+            conn_ids = list(self.canvas_model.block_connections.get(block_id, ()))
+            self.canvas_model.remove_block(block_id)
             self.selected_block = None
-            self.redraw_canvas()
+            self.delete_block_items(block_id, conn_ids)
+    
+    def delete_block_items(self, block_id: str, conn_ids: List[str]):
+        """Delete the canvas items of a removed block and of its connections only."""
+        items = self.item_ids.pop(block_id, None)
+        if items:
+            for item in (items["rect"], items["title"], *items["port_ovals"].values(),
+                         *items["port_labels"].values()):
+                self.item_to_block.pop(item, None)
+                self.item_to_input_port.pop(item, None)
+        self.canvas.delete(f"block:{block_id}")
+        
+        for conn_id in conn_ids:
+            item = self.connection_item.pop(conn_id, None)
+            if item is not None:
+                self.canvas.delete(item)
     
     def edit_block(self):
         """Edit the properties of the selected block."""
@@ -699,6 +1182,7 @@ class VisualBlockEditor(tk.Tk):
             # Update properties
             for key, var in property_vars.items():
                 block.properties[key] = var.get()
+            self.canvas_model.invalidate_code()
             
             dialog.destroy()
             self.redraw_canvas()
@@ -732,13 +1216,15 @@ class VisualBlockEditor(tk.Tk):
             data_type = type_var.get()
             
             if not name:
-                messagebox.showerror("Error", "Port name cannot be empty")
+                self.show_error("Port name cannot be empty")
                 return
             
             if is_input:
                 block.add_input(name, data_type)
             else:
                 block.add_output(name, data_type)
+            self.canvas_model.index_ports(block)
+            self.canvas_model.invalidate_code()
             
             dialog.destroy()
             self.redraw_canvas()
@@ -749,54 +1235,104 @@ class VisualBlockEditor(tk.Tk):
     def show_context_menu(self, event):
         """Show the context menu."""
         items = self.canvas.find_overlapping(event.x-1, event.y-1, event.x+1, event.y+1)
-        for item in items:
-            tags = self.canvas.gettags(item)
-            for tag in tags:
-                if tag.startswith("block:"):
-                    block_id = tag.split(":", 1)[1]
-                    self.select_block(block_id)
-                    self.context_menu.post(event.x_root, event.y_root)
-                    return
+        for item in reversed(items):  # Topmost item first
+            block_id = self.item_to_block.get(item)
+            if block_id:
+                self.select_block(block_id)
+                self.context_menu.post(event.x_root, event.y_root)
+                return
     
     def new_project(self):
         """Create a new project."""
-        if messagebox.askyesno("New Project", "Create a new project? Any unsaved changes will be lost."):
-            self.canvas_model = BlockCanvas()
-            self.selected_block = None
-            self.redraw_canvas()
+        if self.confirm("New Project", "Create a new project? Any unsaved changes will be lost."):
+            self.set_model(BlockCanvas())
+            self.current_path = None
+    
+    def set_status(self, text: str):
+        """Show a message in the status bar; it is cleared after STATUS_TIMEOUT_MS."""
+        if self._status_clear_id is not None:
+            self.after_cancel(self._status_clear_id)
+        self.status_bar.configure(text=text)
+        self._status_clear_id = self.after(STATUS_TIMEOUT_MS, self._clear_status)
+    
+    def _clear_status(self):
+        """Clear the status bar."""
+        self._status_clear_id = None
+        self.status_bar.configure(text="")
+    
+    def show_error(self, message: str):
+        """Report an error in a message box, or in the status bar when running silent."""
+        if self._silent:
+            self.set_status(f"Error: {message}")
+        else:
+            from tkinter import messagebox
+            messagebox.showerror("Error", message)
+    
+    def confirm(self, title: str, message: str) -> bool:
+        """Ask a yes/no question; always yes when running silent."""
+        if self._silent:
+            return True
+        from tkinter import messagebox
+        return messagebox.askyesno(title, message)
     
-    def save_project(self):
-        """Save the current project."""
+    def save_project(self, path: Optional[str] = None):
+        """Save the current project to path, or to the file it was last opened from or saved to."""
+        filename = path or self.current_path
+        if filename is None:
+            self.save_project_as()
+            return
+        self.canvas_model.save_to_json(filename)
+        self.current_path = filename
+        self.set_status(f"Project saved to {filename}")
+    
+    def save_project_as(self):
+        """Save the current project to a file chosen by the user."""
+        from tkinter import filedialog
         filename = filedialog.asksaveasfilename(
             defaultextension=".vbe",
             filetypes=[("Visual Block Editor files", "*.vbe"), ("All files", "*.*")]
         )
         if filename:
-            self.canvas_model.save_to_json(filename)
-            messagebox.showinfo("Save Project", f"Project saved to {filename}")
+            self.save_project(filename)
     
-    def open_project(self):
-        """Open a saved project."""
-        filename = filedialog.askopenfilename(
-            defaultextension=".vbe",
-            filetypes=[("Visual Block Editor files", "*.vbe"), ("All files", "*.*")]
-        )
+    def open_project(self, path: Optional[str] = None):
+        """Open a saved project from path, or from a file chosen by the user."""
+        filename = path
+        if not filename:
+            from tkinter import filedialog
+            filename = filedialog.askopenfilename(
+                defaultextension=".vbe",
+                filetypes=[("Visual Block Editor files", "*.vbe"), ("All files", "*.*")]
+            )
         if filename:
             try:
-                self.canvas_model = BlockCanvas.load_from_json(filename)
-                self.selected_block = None
-                self.redraw_canvas()
-                messagebox.showinfo("Open Project", f"Project loaded from {filename}")
+                self.set_model(BlockCanvas.load_from_json(filename))
+                self.current_path = filename
+                self.set_status(f"Project loaded from {filename}")
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to open project: {e}")
+                self.show_error(f"Failed to open project: {e}")
     
     def show_generated_code(self):
-        """Show the generated code in a dialog."""
-        code = self.canvas_model.generate_code()
+        """Show the generated code in a dialog (built on first use, then reused)."""
+        self._shown_code = self.canvas_model.generate_code()
+        self._shown_code_bytes = self.canvas_model.generate_code_bytes()
+        
+        if self._code_dialog is None or not self._code_dialog.winfo_exists():
+            self._build_code_dialog()
+        else:
+            self._code_dialog.deiconify()
+            self._code_dialog.lift()
         
+        # Insert the code
+        self._code_text.delete("1.0", tk.END)
+        self.insert_text_chunked(self._code_text, self._shown_code)
+    
+    def _build_code_dialog(self):
+        """Create the Generated Code dialog; closing it only hides it."""
         dialog = tk.Toplevel(self)
         dialog.title("Generated Code")
         dialog.geometry("600x400")
+        dialog.protocol("WM_DELETE_WINDOW", dialog.withdraw)
         
         frame = ttk.Frame(dialog, padding=10)
         frame.pack(fill=tk.BOTH, expand=True)
@@ -818,33 +1354,73 @@ class VisualBlockEditor(tk.Tk):
         scrollbar_x.config(command=text_widget.xview)
         text_widget.config(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
         
-        # Insert the code
-        text_widget.insert(tk.END, code)
-        
         # Buttons
         button_frame = ttk.Frame(frame)
         button_frame.pack(fill=tk.X, pady=10)
         
-        def copy_to_clipboard():
-            self.clipboard_clear()
-            self.clipboard_append(code)
-            messagebox.showinfo("Copied", "Code copied to clipboard")
-        
-        def save_to_file():
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".py",
-                filetypes=[("Python files", "*.py"), ("All files", "*.*")]
-            )
-            if filename:
-                with open(filename, 'w') as f:
-                    f.write(code)
-                messagebox.showinfo("Save Code", f"Code saved to {filename}")
+        ttk.Button(button_frame, text="Copy to Clipboard", command=self._copy_shown_code).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Save to File", command=self._save_shown_code).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=dialog.withdraw).pack(side=tk.RIGHT, padx=5)
         
-        ttk.Button(button_frame, text="Copy to Clipboard", command=copy_to_clipboard).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Save to File", command=save_to_file).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Close", command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
+        self._code_dialog = dialog
+        self._code_text = text_widget
+    
+    def _copy_shown_code(self):
+        """Copy the code shown in the Generated Code dialog."""
+        self.copy_text(self._shown_code)
+        self.set_status("Code copied to clipboard")
+    
+    def _save_shown_code(self):
+        """Save the code shown in the Generated Code dialog to a file."""
+        from tkinter import filedialog
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".py",
+            filetypes=[("Python files", "*.py"), ("All files", "*.*")]
+        )
+        if filename:
+            fast_io.write_file(filename, self._shown_code_bytes)
+            self.set_status(f"Code saved to {filename}")
+    
+    def copy_text(self, text: str):
+        """Put text on the clipboard, handing long text to the OS clipboard in one call."""
+        if pyperclip is not None and len(text) > NATIVE_CLIPBOARD_THRESHOLD:
+            try:
+                pyperclip.copy(text)
+                return
+            except pyperclip.PyperclipException:
+                pass  # No clipboard backend (xclip, wl-copy, ...) available; use Tk's
+        self.clipboard_clear()
+        self.clipboard_append(text)
+    
+    def insert_text_chunked(self, text_widget: tk.Text, text: str, start: int = 0):
+        """Append text to a Text widget one chunk per idle callback, so long text doesn't block the UI.
+        
+        Starting a new insert into the same widget cancels the rest of the previous one.
+        """
+        key = str(text_widget)
+        job = self._text_insert_jobs.pop(key, None)
+        if start == 0 and job is not None:
+            self.after_cancel(job)
+        if not text_widget.winfo_exists():
+            return
+        end = start + TEXT_INSERT_CHUNK
+        text_widget.insert(tk.END, text[start:end])
+        if end < len(text):
+            self._text_insert_jobs[key] = self.after_idle(self.insert_text_chunked, text_widget, text, end)
+
+
+def warm_up_kernels():
+    """Compile the optional Numba kernels, so the first drag or code generation doesn't stall."""
+    fast_geom.warm_up()
+    fast_graph.warm_up()
 
 
 if __name__ == "__main__":
+    # Numba releases the GIL while compiling, so this doesn't hold up the UI
+    threading.Thread(target=warm_up_kernels, daemon=True).start()
+    
     app = VisualBlockEditor()
+    # A project file can be given on the command line
+    if len(sys.argv) > 1:
+        app.open_project(sys.argv[1])
     app.mainloop()
\ No newline at end of file
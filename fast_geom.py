@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Geometry kernels for the Visual Block Editor: port layout and viewport culling.
+
+The kernels are compiled with Numba when it (and NumPy) are installed. Otherwise
+the same functions fall back to plain Python loops, so callers don't need to check
+NUMBA_AVAILABLE. All functions take and return plain Python sequences/lists.
+"""
+
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Visible area as (x0, y0, x1, y1) in canvas coordinates
+View = Tuple[float, float, float, float]
+
+
+def _port_offsets_py(length, n):
+    """Offsets of n ports spread evenly along a block side of the given length."""
+    spacing = length / (n + 1)
+    return [(i + 1) * spacing for i in range(n)]
+
+
+def _visible_mask_py(xs, ys, ws, hs, vx0, vy0, vx1, vy1):
+    """Which boxes (x, y, width, height) overlap the view."""
+    return [
+        not (x > vx1 or x + w < vx0 or y > vy1 or y + h < vy0)
+        for x, y, w, h in zip(xs, ys, ws, hs)
+    ]
+
+
+def _segments_visible_py(x0s, y0s, x1s, y1s, vx0, vy0, vx1, vy1):
+    """Which line segments have a bounding box that overlaps the view."""
+    return [
+        not (min(x0, x1) > vx1 or max(x0, x1) < vx0 or min(y0, y1) > vy1 or max(y0, y1) < vy0)
+        for x0, y0, x1, y1 in zip(x0s, y0s, x1s, y1s)
+    ]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _port_offsets_jit(length, n):
+        spacing = length / (n + 1)
+        out = np.empty(n, np.float64)
+        for i in range(n):
+            out[i] = (i + 1) * spacing
+        return out
+
+    @njit(cache=True)
+    def _visible_mask_jit(xs, ys, ws, hs, vx0, vy0, vx1, vy1):
+        out = np.empty(xs.shape[0], np.bool_)
+        for i in range(xs.shape[0]):
+            out[i] = not (xs[i] > vx1 or xs[i] + ws[i] < vx0 or
+                          ys[i] > vy1 or ys[i] + hs[i] < vy0)
+        return out
+
+    @njit(cache=True)
+    def _segments_visible_jit(x0s, y0s, x1s, y1s, vx0, vy0, vx1, vy1):
+        out = np.empty(x0s.shape[0], np.bool_)
+        for i in range(x0s.shape[0]):
+            out[i] = not (min(x0s[i], x1s[i]) > vx1 or max(x0s[i], x1s[i]) < vx0 or
+                          min(y0s[i], y1s[i]) > vy1 or max(y0s[i], y1s[i]) < vy0)
+        return out
+
+
+def port_offsets(length: float, n: int) -> List[float]:
+    """Get the offsets of n ports spread evenly along a block side of the given length."""
+    if NUMBA_AVAILABLE:
+        return _port_offsets_jit(float(length), n).tolist()
+    return _port_offsets_py(length, n)
+
+
+def visible_mask(xs: Sequence[float], ys: Sequence[float], ws: Sequence[float],
+                 hs: Sequence[float], view: View) -> List[bool]:
+    """Check which boxes, given as parallel x/y/width/height sequences, overlap the view."""
+    if NUMBA_AVAILABLE:
+        arrays = [np.asarray(values, dtype=np.float64) for values in (xs, ys, ws, hs)]
+        return _visible_mask_jit(*arrays, *map(float, view)).tolist()
+    return _visible_mask_py(xs, ys, ws, hs, *view)
+
+
+def segments_visible(x0s: Sequence[float], y0s: Sequence[float], x1s: Sequence[float],
+                     y1s: Sequence[float], view: View) -> List[bool]:
+    """Check which line segments, given as parallel endpoint sequences, may cross the view."""
+    if NUMBA_AVAILABLE:
+        arrays = [np.asarray(values, dtype=np.float64) for values in (x0s, y0s, x1s, y1s)]
+        return _segments_visible_jit(*arrays, *map(float, view)).tolist()
+    return _segments_visible_py(x0s, y0s, x1s, y1s, *view)
+
+
+def warm_up() -> None:
+    """Compile the kernels (or load them from Numba's cache) so first use doesn't stall.
+
+    Uses the same argument types as the editor, so no extra specializations are built.
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    view = (0.0, 0.0, 1.0, 1.0)
+    port_offsets(100, 2)
+    visible_mask([0.0], [0.0], [1.0], [1.0], view)
+    segments_visible([0.0], [0.0], [1.0], [1.0], view)
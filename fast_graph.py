@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Optional Numba-compiled graph kernels for the Visual Block Editor.
+
+Numba (and NumPy) are optional. Check NUMBA_AVAILABLE before calling any kernel;
+callers keep a pure-Python path for when it is False.
+"""
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def kahn_sort(n, edges_src, edges_dst):
+        """Topologically sort nodes 0..n-1 of the graph given as parallel edge arrays.
+
+        Returns the sorted node indices. Nodes that are part of a cycle are left out,
+        so the result is shorter than n if the graph is not a DAG. Successors are
+        visited in edge order, matching BlockCanvas.topological_order.
+        """
+        m = edges_src.shape[0]
+        indegree = np.zeros(n, np.int32)
+        offsets = np.zeros(n + 1, np.int32)
+        for e in range(m):
+            indegree[edges_dst[e]] += 1
+            offsets[edges_src[e] + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        # Successor lists in CSR form, keeping the original edge order per node
+        successors = np.empty(m, np.int32)
+        cursor = offsets[:-1].copy()
+        for e in range(m):
+            successors[cursor[edges_src[e]]] = edges_dst[e]
+            cursor[edges_src[e]] += 1
+
+        queue = np.empty(n, np.int32)
+        head = 0
+        tail = 0
+        for i in range(n):
+            if indegree[i] == 0:
+                queue[tail] = i
+                tail += 1
+
+        while head < tail:
+            node = queue[head]
+            head += 1
+            for k in range(offsets[node], offsets[node + 1]):
+                target = successors[k]
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    queue[tail] = target
+                    tail += 1
+
+        return queue[:tail]
+
+    def kahn_order(n, edges):
+        """Run kahn_sort over a list of (source, target) index pairs and return a list of indices."""
+        pairs = np.array(edges, dtype=np.int32).reshape(-1, 2)
+        return kahn_sort(n, np.ascontiguousarray(pairs[:, 0]), np.ascontiguousarray(pairs[:, 1])).tolist()
+
+
+def warm_up():
+    """Compile kahn_sort (or load it from Numba's cache) so the first large sort doesn't stall."""
+    if NUMBA_AVAILABLE:
+        kahn_order(2, [(0, 1)])
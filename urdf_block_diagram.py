@@ -7,25 +7,57 @@ showing the robot's joint/link structure.
 import sys
 import os
 import argparse
-import xml.etree.ElementTree as ET
 import tkinter as tk
-from tkinter import ttk, filedialog, simpledialog
+from tkinter import ttk
 import math
-from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Dict, Tuple, Optional
 
-import sv_ttk
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:  # lxml is optional; the standard library parser is slower but equivalent
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; arrow geometry is then computed one joint at a time
+    np = None
 
-@dataclass
+# <limit> attributes copied into Joint.limit
+LIMIT_ATTRIBUTES = frozenset(('lower', 'upper', 'effort', 'velocity'))
+
+# Below this many arrows, numpy's call overhead outweighs the vectorized arithmetic
+ARROW_BATCH_THRESHOLD = 64
+
+# Arrow colors by joint type
+JOINT_COLORS = {
+    "revolute": "#FF6900",  # Orange
+    "prismatic": "#FCB900",  # Yellow
+    "fixed": "#7BDCB5",  # Green
+}
+DEFAULT_JOINT_COLOR = "#8ED1FC"  # Blue
+
+# Average glyph width relative to the font size, for wrapping exported block labels
+PS_CHAR_WIDTH = 0.55
+# How often the UI checks whether a background export has finished
+EXPORT_POLL_MS = 50
+
+
+@dataclass(slots=True)
 class Link:
     """Represents a robot link from the URDF."""
     name: str
     visual: bool = False  # Whether the link has visual elements
     collision: bool = False  # Whether the link has collision elements
     inertial: bool = False  # Whether the link has inertial properties
+    # Block text, formatted once since the fields don't change after parsing
+    label: str = field(default="", init=False, repr=False, compare=False)
     
-    def __str__(self) -> str:
+    def __post_init__(self):
         properties = []
         if self.visual:
             properties.append("visual")
@@ -35,11 +67,15 @@ class Link:
             properties.append("inertial")
         
         if properties:
-            return f"{self.name} ({', '.join(properties)})"
-        return self.name
+            self.label = f"{self.name} ({', '.join(properties)})"
+        else:
+            self.label = self.name
+    
+    def __str__(self) -> str:
+        return self.label
 
 
-@dataclass
+@dataclass(slots=True)
 class Joint:
     """Represents a robot joint from the URDF."""
     name: str
@@ -49,10 +85,14 @@ class Joint:
     axis: Optional[Tuple[float, float, float]] = None
     limit: Optional[Dict[str, float]] = None
     # New fields for interfaces
-    state_interfaces: List[str] = None
-    command_interfaces: List[str] = None
+    state_interfaces: Optional[List[str]] = None
+    command_interfaces: Optional[List[str]] = None
     # Hardware interfaces (added manually by the user)
-    hardware_interfaces: List[str] = None
+    hardware_interfaces: Optional[List[str]] = None
+    # The interface lists joined for display; call update_labels() after changing the lists
+    state_str: str = field(default="", init=False, repr=False, compare=False)
+    command_str: str = field(default="", init=False, repr=False, compare=False)
+    hardware_str: str = field(default="", init=False, repr=False, compare=False)
     
     def __post_init__(self):
         # Initialize lists if they were None
@@ -75,6 +115,14 @@ class Joint:
                 self.command_interfaces = ["position"]
             elif self.joint_type == "fixed":
                 self.command_interfaces = []
+        
+        self.update_labels()
+    
+    def update_labels(self):
+        """Recompute the joined interface strings used by __str__ and the diagram."""
+        self.state_str = ", ".join(self.state_interfaces)
+        self.command_str = ", ".join(self.command_interfaces)
+        self.hardware_str = ", ".join(self.hardware_interfaces)
     
     def __str__(self) -> str:
         joint_info = f"{self.name} ({self.joint_type})"
@@ -82,9 +130,9 @@ class Joint:
         # Add interface information if present
         interface_info = []
         if self.state_interfaces:
-            interface_info.append(f"state: {', '.join(self.state_interfaces)}")
+            interface_info.append(f"state: {self.state_str}")
         if self.command_interfaces:
-            interface_info.append(f"cmd: {', '.join(self.command_interfaces)}")
+            interface_info.append(f"cmd: {self.command_str}")
         
         if interface_info:
             joint_info += f"\n{'; '.join(interface_info)}"
@@ -105,82 +153,12 @@ class URDFParser:
     def parse(self):
         """Parse the URDF file."""
         try:
-            tree = ET.parse(self.urdf_file)
-            root = tree.getroot()
-            
-            # Parse links
-            for link_elem in root.findall('link'):
-                name = link_elem.get('name')
-                visual = len(link_elem.findall('visual')) > 0
-                collision = len(link_elem.findall('collision')) > 0
-                inertial = link_elem.find('inertial') is not None
-                
-                self.links[name] = Link(name, visual, collision, inertial)
-            
-            # Parse joints
-            for joint_elem in root.findall('joint'):
-                name = joint_elem.get('name')
-                joint_type = joint_elem.get('type')
-                
-                parent_elem = joint_elem.find('parent')
-                child_elem = joint_elem.find('child')
-                
-                if parent_elem is not None and child_elem is not None:
-                    parent = parent_elem.get('link')
-                    child = child_elem.get('link')
-                    
-                    # Parse axis if present
-                    axis = None
-                    axis_elem = joint_elem.find('axis')
-                    if axis_elem is not None:
-                        xyz = axis_elem.get('xyz')
-                        if xyz:
-                            axis = tuple(map(float, xyz.split()))
-                    
-                    # Parse limits if present
-                    limit = None
-                    limit_elem = joint_elem.find('limit')
-                    if limit_elem is not None:
-                        limit = {}
-                        for attr in ['lower', 'upper', 'effort', 'velocity']:
-                            val = limit_elem.get(attr)
-                            if val:
-                                limit[attr] = float(val)
-                    
-                    # Look for state and command interfaces (custom extension)
-                    state_interfaces = []
-                    command_interfaces = []
-                    
-                    # Check for ros2_control tag first (common in ROS 2 URDF files)
-                    ros2_control = joint_elem.find('./ros2_control')
-                    if ros2_control is not None:
-                        state_interfaces_elem = ros2_control.find('./state_interfaces')
-                        if state_interfaces_elem is not None:
-                            for interface in state_interfaces_elem.findall('./interface'):
-                                state_interfaces.append(interface.get('name'))
-                        
-                        command_interfaces_elem = ros2_control.find('./command_interfaces')
-                        if command_interfaces_elem is not None:
-                            for interface in command_interfaces_elem.findall('./interface'):
-                                command_interfaces.append(interface.get('name'))
-                    
-                    # Also check for gazebo ros_control plugin tags
-                    gazebo = joint_elem.find('./gazebo')
-                    if gazebo is not None:
-                        plugin = gazebo.find('./plugin[@name="gazebo_ros_control"]')
-                        if plugin is not None:
-                            state_ifaces = plugin.find('./state_interface')
-                            if state_ifaces is not None and state_ifaces.text:
-                                state_interfaces = state_ifaces.text.split()
-                            
-                            command_ifaces = plugin.find('./command_interface')
-                            if command_ifaces is not None and command_ifaces.text:
-                                command_interfaces = command_interfaces.text.split()
-                                
-                    self.joints.append(Joint(
-                        name, joint_type, parent, child, 
-                        axis, limit, state_interfaces, command_interfaces
-                    ))
+            # Links and joints are handled as soon as each element has been read
+            for elem in self._iter_elements():
+                if elem.tag == 'link':
+                    self._parse_link(elem)
+                else:
+                    self._parse_joint(elem)
             
         except ET.ParseError as e:
             print(f"Error parsing URDF file: {e}")
@@ -188,7 +166,140 @@ class URDFParser:
         except Exception as e:
             print(f"Unexpected error: {e}")
             sys.exit(1)
+    
+    def _iter_elements(self):
+        """Stream the <link> and <joint> elements directly under <robot>.
+        
+        Each element is freed once the caller has moved on to the next one, so memory
+        use doesn't grow with the size of the file.
+        """
+        if LXML_AVAILABLE:
+            # libxml2 does the tag filtering, so only link/joint elements reach Python.
+            # Whitespace-only text isn't kept, and huge_tree lifts libxml2's size limits.
+            for _, elem in ET.iterparse(self.urdf_file, events=('end',), tag=('link', 'joint'),
+                                        remove_blank_text=True, huge_tree=True):
+                parent = elem.getparent()
+                if parent is None or parent.getparent() is not None:
+                    continue  # A nested reference, e.g. <transmission><joint>
+                yield elem
+                elem.clear()
+                # Drop everything before this element, parsed or not (<gazebo>, <material>, ...)
+                while elem.getprevious() is not None:
+                    del parent[0]
+            return
+        
+        depth = 0
+        root = None
+        for event, elem in ET.iterparse(self.urdf_file, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                if elem.tag in ('link', 'joint'):
+                    yield elem
+                # Children of <robot> are removed as they end, so this is always the first one
+                root.remove(elem)
+    
+    def _parse_link(self, link_elem):
+        """Add the link described by a <link> element."""
+        name = link_elem.get('name')
+        # One walk over the children instead of a find() per element
+        tags = {child.tag for child in link_elem}
+        
+        self.links[name] = Link(name, 'visual' in tags, 'collision' in tags, 'inertial' in tags)
+    
+    def _parse_joint(self, joint_elem):
+        """Add the joint described by a <joint> element, if it names its parent and child."""
+        name = joint_elem.get('name')
+        joint_type = joint_elem.get('type')
+        
+        children = _first_children(joint_elem)
+        parent_elem = children.get('parent')
+        child_elem = children.get('child')
+        if parent_elem is None or child_elem is None:
+            return
+        parent = parent_elem.get('link')
+        child = child_elem.get('link')
+        
+        # Parse axis if present
+        axis = None
+        axis_elem = children.get('axis')
+        if axis_elem is not None:
+            xyz = axis_elem.get('xyz')
+            if xyz:
+                axis = tuple(map(float, xyz.split()))
+        
+        # Parse limits if present
+        limit = None
+        limit_elem = children.get('limit')
+        if limit_elem is not None:
+            limit = {attr: float(val) for attr, val in limit_elem.attrib.items()
+                     if attr in LIMIT_ATTRIBUTES and val}
+        
+        # Look for state and command interfaces (custom extension)
+        state_interfaces = []
+        command_interfaces = []
+        
+        # Check for ros2_control tag first (common in ROS 2 URDF files)
+        ros2_control = children.get('ros2_control')
+        if ros2_control is not None:
+            sections = _first_children(ros2_control)
+            if 'state_interfaces' in sections:
+                state_interfaces = _interface_names(sections['state_interfaces'])
+            if 'command_interfaces' in sections:
+                command_interfaces = _interface_names(sections['command_interfaces'])
+            if not state_interfaces and not command_interfaces:
+                # Likely a typo; point at it rather than silently using the defaults
+                line = getattr(ros2_control, 'sourceline', None)  # Only lxml records line numbers
+                where = f"[line {line}] " if line else ""
+                print(f"Warning: {where}empty <ros2_control> for joint {name}, using default interfaces")
+        
+        # Also check for gazebo ros_control plugin tags
+        gazebo = children.get('gazebo')
+        if gazebo is not None:
+            plugin = next((elem for elem in gazebo
+                           if elem.tag == 'plugin' and elem.get('name') == 'gazebo_ros_control'), None)
+            if plugin is not None:
+                plugin_children = _first_children(plugin)
+                state_ifaces = plugin_children.get('state_interface')
+                if state_ifaces is not None and state_ifaces.text:
+                    state_interfaces = state_ifaces.text.split()
+                
+                command_ifaces = plugin_children.get('command_interface')
+                if command_ifaces is not None and command_ifaces.text:
+                    command_interfaces = command_ifaces.text.split()
+        
+        self.joints.append(Joint(
+            name, joint_type, parent, child, 
+            axis, limit, state_interfaces, command_interfaces
+        ))
+
+
+def _first_children(elem) -> dict:
+    """Map each child tag to the first child with that tag (what elem.find(tag) would return)."""
+    children = {}
+    for child in elem:
+        children.setdefault(child.tag, child)
+    return children
+
+
+def _interface_names(elem) -> List[str]:
+    """Names of the <interface> children of a ros2_control interfaces element."""
+    return [child.get('name') for child in elem if child.tag == 'interface']
+
 
+def _ps_string(text: str) -> str:
+    """Quote text as a PostScript string literal."""
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def _ps_color(color: str) -> str:
+    """Get the setrgbcolor command for a #RRGGBB color."""
+    r, g, b = (int(color[i:i + 2], 16) / 255 for i in (1, 3, 5))
+    return f"{r:.3f} {g:.3f} {b:.3f} setrgbcolor"
 
 class BlockDiagramCanvas(tk.Canvas):
     """Canvas for drawing the block diagram."""
@@ -203,15 +314,27 @@ class BlockDiagramCanvas(tk.Canvas):
         
         # For dragging functionality
         self.drag_data = {"x": 0, "y": 0, "item": None}
+        # Drag motion waiting to be applied by _flush_drag
+        self._pending_link = None
+        self._pending_dx = 0
+        self._pending_dy = 0
+        self._drag_flush_scheduled = False
         self.block_map = {}  # Maps canvas items to link names
-        self.joint_items = {}  # Maps canvas items to joint objects
+        self.by_name = {}  # Maps link names to (rectangle item, text item, center x, center y)
         self.hardware_blocks = {}  # Maps joint names to hardware interface blocks
+        self.arrows = {}  # Maps joint names to their arrow line and label items
+        self.link_joints = {}  # Maps link names to the joints drawn to or from them
+        
+        # Called after a block drag ends
+        self.on_layout_changed: Optional[Callable[[], None]] = None
+        # Called with a joint name when its arrow is right-clicked
+        self.on_add_hardware_interface: Optional[Callable[[str], None]] = None
         
-        # Bind mouse events
-        self.bind("<ButtonPress-1>", self._on_press)
+        # Bind mouse events to the item tags, so Tk only calls back for blocks and arrows
+        self.tag_bind("draggable", "<ButtonPress-1>", self._on_press)
+        self.tag_bind("draggable", "<B1-Motion>", self._on_drag)
         self.bind("<ButtonRelease-1>", self._on_release)
-        self.bind("<B1-Motion>", self._on_drag)
-        self.bind("<ButtonPress-3>", self._on_right_click)  # Right-click event
+        self.tag_bind("arrow", "<ButtonPress-3>", self._on_right_click)  # Right-click event
         
     def draw_block(self, x, y, text, block_type="link", selected=False, link_name=None):
         """Draw a block representing a link or joint."""
@@ -226,6 +349,9 @@ class BlockDiagramCanvas(tk.Canvas):
             outline_width = 3
         else:
             outline_width = 1
+        
+        # Both items of a link's block share a link_<name> tag so they can be raised together
+        tags = ("draggable", f"link_{link_name}") if link_name else ()
             
         # Draw the block
         block = self.create_rectangle(
@@ -233,57 +359,51 @@ class BlockDiagramCanvas(tk.Canvas):
             x + self.block_width/2, y + self.block_height/2,
             fill=fill_color, outline=outline_color,
             width=outline_width,
-            tags="draggable" if link_name else ""
+            tags=tags
         )
         
         # Draw the text
         text_id = self.create_text(
             x, y, text=text, font=("Arial", 9), width=self.block_width - 10,
-            tags="draggable" if link_name else ""
+            tags=tags
         )
         
         # Store link name to block mapping if provided
         if link_name:
             self.block_map[block] = link_name
             self.block_map[text_id] = link_name
+            self.by_name[link_name] = (block, text_id, x, y)
             
         return block, text_id
     
     def draw_arrow(self, x1, y1, x2, y2, joint_type, joint_name=None, 
-                  state_interfaces=None, command_interfaces=None, joint_obj=None):
-        """Draw an arrow between blocks with color based on joint type."""
+                  state_interfaces=None, command_interfaces=None, joint_obj=None, points=None):
+        """Draw an arrow between blocks with color based on joint type.
+        
+        points can pass in the arrow's _arrow_points() if they were already computed.
+        """
+        # Remember which joints touch which links, so moving a block can update its arrows
+        if joint_name and joint_obj:
+            for link_name in (joint_obj.parent, joint_obj.child):
+                joints = self.link_joints.setdefault(link_name, [])
+                if joint_obj not in joints:
+                    joints.append(joint_obj)
+        
         # Set color based on joint type
-        if joint_type == "revolute":
-            color = "#FF6900"  # Orange
-        elif joint_type == "prismatic":
-            color = "#FCB900"  # Yellow
-        elif joint_type == "fixed":
-            color = "#7BDCB5"  # Green
-        else:
-            color = "#8ED1FC"  # Blue
+        color = JOINT_COLORS.get(joint_type, DEFAULT_JOINT_COLOR)
             
         # Calculate arrow points
-        dx = x2 - x1
-        dy = y2 - y1
-        length = math.sqrt(dx*dx + dy*dy)
-        
-        if length == 0:
+        if points is None:
+            points = self._arrow_points(x1, y1, x2, y2)
+        if points is None:
             return
-            
-        # Normalized direction
-        dx, dy = dx/length, dy/length
-        
-        # Shorten the line to leave space for blocks
-        start_x = x1 + dx * self.block_width/2
-        start_y = y1 + dy * self.block_height/2
-        end_x = x2 - dx * self.block_width/2
-        end_y = y2 - dy * self.block_height/2
+        start_x, start_y, end_x, end_y = points
         
         # Draw the line
         line = self.create_line(
             start_x, start_y, end_x, end_y,
             width=2, arrow=tk.LAST, fill=color,
-            tags=f"connector joint_{joint_name}" if joint_name else "connector"
+            tags=f"connector arrow joint_{joint_name}" if joint_name else "connector"
         )
         
         # Add joint type as text near the middle of the arrow
@@ -300,61 +420,157 @@ class BlockDiagramCanvas(tk.Canvas):
             text=joint_info,
             font=("Arial", 8),
             fill=color,
-            tags=f"connector_text joint_{joint_name}" if joint_name else "connector_text"
+            tags=f"connector_text arrow joint_{joint_name}" if joint_name else "connector_text"
         )
+        # Text items and their vertical offsets from the middle of the arrow
+        texts = [(text_id, -15)]
         
         # Display interfaces if available
         y_offset = 0
         if state_interfaces and len(state_interfaces) > 0:
-            self.create_text(
+            state_id = self.create_text(
                 mid_x, mid_y + y_offset + 5,
-                text=f"State: {', '.join(state_interfaces)}",
+                text=f"State: {joint_obj.state_str if joint_obj else ', '.join(state_interfaces)}",
                 font=("Arial", 7),
                 fill=color,
                 tags=f"connector_text joint_{joint_name}" if joint_name else "connector_text"
             )
+            texts.append((state_id, y_offset + 5))
             y_offset += 12
         
         if command_interfaces and len(command_interfaces) > 0:
-            self.create_text(
+            cmd_id = self.create_text(
                 mid_x, mid_y + y_offset + 5,
-                text=f"Cmd: {', '.join(command_interfaces)}",
+                text=f"Cmd: {joint_obj.command_str if joint_obj else ', '.join(command_interfaces)}",
                 font=("Arial", 7),
                 fill=color,
                 tags=f"connector_text joint_{joint_name}" if joint_name else "connector_text"
             )
+            texts.append((cmd_id, y_offset + 5))
             y_offset += 12
         
         # Display hardware interfaces if available
         if joint_obj and joint_obj.hardware_interfaces:
-            self.create_text(
+            hw_id = self.create_text(
                 mid_x, mid_y + y_offset + 5,
-                text=f"Hardware: {', '.join(joint_obj.hardware_interfaces)}",
+                text=f"Hardware: {joint_obj.hardware_str}",
                 font=("Arial", 7, "bold"),  # Bold to highlight it's manually added
                 fill="#CF2E2E",  # Red color to make it stand out
                 tags=f"connector_text joint_{joint_name}" if joint_name else "connector_text"
             )
+            texts.append((hw_id, y_offset + 5))
             
             # Draw hardware interface block if not yet present
             if joint_name and joint_name not in self.hardware_blocks:
                 self.draw_hardware_interface_block(mid_x, mid_y + 60, joint_obj)
         
-        # Store joint information for right-click handling
         if joint_name and joint_obj:
-            self.joint_items[line] = joint_obj
-            self.joint_items[text_id] = joint_obj
+            # Keep the item IDs so the arrow can be moved instead of redrawn
+            self.arrows[joint_name] = {"line": line, "texts": texts}
         
         return line, text_id
     
+    def _arrow_points(self, x1, y1, x2, y2):
+        """Get the (start_x, start_y, end_x, end_y) of an arrow between two block centers.
+        
+        Returns None if the centers coincide.
+        """
+        dx = x2 - x1
+        dy = y2 - y1
+        length = math.sqrt(dx*dx + dy*dy)
+        
+        if length == 0:
+            return None
+            
+        # Normalized direction
+        dx, dy = dx/length, dy/length
+        
+        # Shorten the line to leave space for blocks
+        return (x1 + dx * self.block_width/2, y1 + dy * self.block_height/2,
+                x2 - dx * self.block_width/2, y2 - dy * self.block_height/2)
+    
+    def arrow_points_batch(self, centers):
+        """Get _arrow_points() for a list of (x1, y1, x2, y2) block center pairs.
+        
+        Large batches are computed with numpy in one vectorized pass when it is installed.
+        """
+        if np is None or len(centers) < ARROW_BATCH_THRESHOLD:
+            return [self._arrow_points(*pair) for pair in centers]
+        
+        pairs = np.asarray(centers, dtype=np.float64)
+        deltas = pairs[:, 2:] - pairs[:, :2]
+        lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+        # Shorten the lines to leave space for blocks
+        trim = deltas / np.where(lengths == 0, 1, lengths)[:, None] * (self.block_width/2, self.block_height/2)
+        points = np.hstack((pairs[:, :2] + trim, pairs[:, 2:] - trim)).tolist()
+        return [None if length == 0 else tuple(p) for p, length in zip(points, lengths.tolist())]
+    
+    def update_arrow(self, joint_obj):
+        """Move a joint's arrow, its labels and its hardware block to the current block positions."""
+        parent_pos = self.get_block_position(joint_obj.parent)
+        child_pos = self.get_block_position(joint_obj.child)
+        if parent_pos is None or child_pos is None:
+            return
+        
+        arrow = self.arrows.get(joint_obj.name)
+        if arrow is None:
+            # Not drawn yet (the blocks were on top of each other)
+            self.draw_joint_arrow(joint_obj)
+            return
+        
+        points = self._arrow_points(*parent_pos, *child_pos)
+        if points is None:
+            return
+        start_x, start_y, end_x, end_y = points
+        mid_x = (start_x + end_x) / 2
+        mid_y = (start_y + end_y) / 2
+        
+        self.coords(arrow["line"], start_x, start_y, end_x, end_y)
+        for text_id, offset in arrow["texts"]:
+            self.coords(text_id, mid_x, mid_y + offset)
+        
+        hw_items = self.hardware_blocks.get(joint_obj.name)
+        if hw_items:
+            block, text_id, connector = hw_items
+            rect, text_pos, line = self._hardware_block_coords(mid_x, mid_y + 60)
+            self.coords(block, *rect)
+            self.coords(text_id, *text_pos)
+            self.coords(connector, *line)
+    
+    def draw_joint_arrow(self, joint_obj):
+        """Draw the arrow for a joint between the current positions of its blocks."""
+        parent_pos = self.get_block_position(joint_obj.parent)
+        child_pos = self.get_block_position(joint_obj.child)
+        if parent_pos is None or child_pos is None:
+            return
+        self.draw_arrow(
+            parent_pos[0], parent_pos[1],
+            child_pos[0], child_pos[1],
+            joint_obj.joint_type,
+            joint_obj.name,
+            joint_obj.state_interfaces,
+            joint_obj.command_interfaces,
+            joint_obj
+        )
+    
+    def _hardware_block_coords(self, x, y):
+        """Get the rectangle, text position and connector line of a hardware block centered at (x, y)."""
+        rect = (x - self.block_width/2, y - self.block_height/3,
+                x + self.block_width/2, y + self.block_height/3)
+        line = (x, y - self.block_height/3,  # Top of hardware block
+                x, y - 30)  # Below the joint arrow
+        return rect, (x, y), line
+    
     def draw_hardware_interface_block(self, x, y, joint_obj):
         """Draw a hardware interface block associated with a joint."""
         if not joint_obj.hardware_interfaces:
             return
+        
+        rect, text_pos, line = self._hardware_block_coords(x, y)
             
         # Draw a distinctive block for hardware interface
         block = self.create_rectangle(
-            x - self.block_width/2, y - self.block_height/3,
-            x + self.block_width/2, y + self.block_height/3,
+            *rect,
             fill="#FFF0F0",  # Light red background
             outline="#CF2E2E",  # Red outline
             width=2,
@@ -362,67 +578,174 @@ class BlockDiagramCanvas(tk.Canvas):
         )
         
         # Draw the text
-        text = f"Hardware Interface\n{', '.join(joint_obj.hardware_interfaces)}"
+        text = f"Hardware Interface\n{joint_obj.hardware_str}"
         text_id = self.create_text(
-            x, y, text=text, font=("Arial", 8, "bold"),
+            *text_pos, text=text, font=("Arial", 8, "bold"),
             fill="#CF2E2E",
             width=self.block_width - 10,
             tags=f"hw_block joint_{joint_obj.name}"
         )
         
-        # Store reference to the hardware block
-        self.hardware_blocks[joint_obj.name] = (block, text_id)
-        
         # Add connector from joint to hardware interface
-        self.create_line(
-            x, y - self.block_height/3,  # Top of hardware block
-            x, y - 30,  # Below the joint arrow
+        connector = self.create_line(
+            *line,
             width=2, dash=(4, 2),  # Dashed line
             fill="#CF2E2E",
             tags=f"hw_connector joint_{joint_obj.name}"
         )
+        
+        # Store reference to the hardware block
+        self.hardware_blocks[joint_obj.name] = (block, text_id, connector)
     
     def update_hardware_interface_block(self, joint_obj):
-        """Update or create a hardware interface block for a joint."""
-        if joint_obj.name in self.hardware_blocks:
-            # Delete existing block
-            block, text_id = self.hardware_blocks[joint_obj.name]
-            self.delete(block)
-            self.delete(text_id)
-            self.delete(f"hw_connector joint_{joint_obj.name}")
-            del self.hardware_blocks[joint_obj.name]
+        """Redraw a joint's arrow with its current hardware interfaces and hardware block."""
+        self.remove_joint_arrow(joint_obj)
+        self.draw_joint_arrow(joint_obj)
+    
+    def diagram_postscript(self, blocks, arrows, bounds):
+        """Render a whole diagram as EPS document bytes, styled like the canvas items.
+        
+        blocks holds (x, y, label) per link and arrows (x1, y1, x2, y2, joint) per joint,
+        with centers in canvas coordinates; bounds is the (x0, y0, x1, y1) area to export.
+        Only the canvas's sizes are used, never Tk, so this works for blocks that are
+        scrolled out of view and therefore not drawn.
+        """
+        bx0, by0, bx1, by1 = bounds
+        # Lines are encoded straight into one growing buffer; the standard fonts are Latin-1
+        out = bytearray()
+        
+        def emit(line):
+            out.extend(line.encode('latin-1', 'replace'))
+            out.extend(b"\n")
+        
+        def point(x, y):
+            # PostScript's y axis points up
+            return f"{x - bx0:.1f} {by1 - y:.1f}"
+        
+        def text(x, y, lines, size, font="Helvetica"):
+            # Lines centered on (x, y), like a Tk text item
+            top = y - (len(lines) - 1) * (size + 2) / 2
+            emit(f"/{font} findfont {size} scalefont setfont")
+            for i, line in enumerate(lines):
+                emit(f"{point(x, top + i * (size + 2) + size * 0.35)} moveto {_ps_string(line)} ctext")
+        
+        def rect(x0, y0, x1, y1, fill, outline, width):
+            box = f"{x0 - bx0:.1f} {by1 - y1:.1f} {x1 - x0:.1f} {y1 - y0:.1f}"
+            emit(f"{_ps_color(fill)} {box} rectfill")
+            emit(f"{_ps_color(outline)} {width} setlinewidth {box} rectstroke")
+        
+        emit("%!PS-Adobe-3.0 EPSF-3.0")
+        emit(f"%%BoundingBox: 0 0 {math.ceil(bx1 - bx0)} {math.ceil(by1 - by0)}")
+        emit("%%EndComments")
+        emit("/ctext { dup stringwidth pop 2 div neg 0 rmoveto show } def")
+        
+        for x1, y1, x2, y2, joint in arrows:
+            points = self._arrow_points(x1, y1, x2, y2)
+            if points is None:
+                continue
+            start_x, start_y, end_x, end_y = points
+            mid_x = (start_x + end_x) / 2
+            mid_y = (start_y + end_y) / 2
+            color = JOINT_COLORS.get(joint.joint_type, DEFAULT_JOINT_COLOR)
+            
+            # Line with an arrowhead at the child end, like Tk's default arrowshape
+            length = math.hypot(end_x - start_x, end_y - start_y)
+            ux, uy = (end_x - start_x) / length, (end_y - start_y) / length
+            emit(f"{_ps_color(color)} 2 setlinewidth newpath "
+                       f"{point(start_x, start_y)} moveto {point(end_x - 8 * ux, end_y - 8 * uy)} lineto stroke")
+            emit(f"newpath {point(end_x, end_y)} moveto "
+                       f"{point(end_x - 10 * ux - 4 * uy, end_y - 10 * uy + 4 * ux)} lineto "
+                       f"{point(end_x - 10 * ux + 4 * uy, end_y - 10 * uy - 4 * ux)} lineto closepath fill")
             
-        # Find position of the joint
-        items = self.find_withtag(f"joint_{joint_obj.name}")
-        if items:
-            bbox = self.bbox(items[0])
-            if bbox:
-                center_x = (bbox[0] + bbox[2]) / 2
-                center_y = (bbox[1] + bbox[3]) / 2
+            # Joint name and interface labels
+            text(mid_x, mid_y - 15, [f"{joint.name} ({joint.joint_type})"], 8)
+            y_offset = 0
+            if joint.state_interfaces:
+                text(mid_x, mid_y + y_offset + 5, [f"State: {joint.state_str}"], 7)
+                y_offset += 12
+            if joint.command_interfaces:
+                text(mid_x, mid_y + y_offset + 5, [f"Cmd: {joint.command_str}"], 7)
+                y_offset += 12
+            if joint.hardware_interfaces:
+                emit(_ps_color("#CF2E2E"))
+                text(mid_x, mid_y + y_offset + 5, [f"Hardware: {joint.hardware_str}"], 7, "Helvetica-Bold")
                 
-                # Draw new hardware block if there are interfaces
-                if joint_obj.hardware_interfaces:
-                    self.draw_hardware_interface_block(center_x, center_y + 60, joint_obj)
+                block, text_pos, line = self._hardware_block_coords(mid_x, mid_y + 60)
+                rect(*block, "#FFF0F0", "#CF2E2E", 2)
+                emit(f"[4 2] 0 setdash newpath {point(*line[:2])} moveto {point(*line[2:])} lineto stroke [] 0 setdash")
+                text(*text_pos, ["Hardware Interface", joint.hardware_str], 8, "Helvetica-Bold")
+        
+        # Blocks go on top of the arrows; long labels wrap like the canvas text does
+        wrap = max(1, int((self.block_width - 10) / (9 * PS_CHAR_WIDTH)))
+        for x, y, label in blocks:
+            rect(x - self.block_width/2, y - self.block_height/2,
+                 x + self.block_width/2, y + self.block_height/2, "#8ED1FC", "#0693E3", 1)
+            emit("0 setgray")
+            text(x, y, textwrap.wrap(label, wrap) or [""], 9)
+        
+        emit("showpage")
+        emit("%%EOF")
+        return out
+    
+    def move_block(self, link_name, x, y):
+        """Move a drawn block so its center is at (x, y). Its arrows are left to the caller."""
+        block, text_id, _, _ = self.by_name[link_name]
+        self.coords(block,
+                    x - self.block_width/2, y - self.block_height/2,
+                    x + self.block_width/2, y + self.block_height/2)
+        self.coords(text_id, x, y)
+        self.by_name[link_name] = (block, text_id, x, y)
+    
+    def remove_block(self, link_name):
+        """Delete a link's block and the arrows (with hardware blocks) attached to it."""
+        entry = self.by_name.pop(link_name, None)
+        if entry is None:
+            return
+        block, text_id, _, _ = entry
+        self.block_map.pop(block, None)
+        self.block_map.pop(text_id, None)
+        self.delete(block, text_id)
+        
+        for joint_obj in self.link_joints.get(link_name, ()):
+            self.remove_joint_arrow(joint_obj)
+    
+    def remove_joint_arrow(self, joint_obj):
+        """Delete a joint's arrow, its labels and its hardware block."""
+        self.delete(f"joint_{joint_obj.name}")
+        self.arrows.pop(joint_obj.name, None)
+        self.hardware_blocks.pop(joint_obj.name, None)
+    
+    def clear_diagram(self):
+        """Delete every item and forget all block and joint bookkeeping."""
+        self.delete("all")
+        self.block_map = {}
+        self.by_name = {}
+        self.hardware_blocks = {}
+        self.arrows = {}
+        self.link_joints = {}
         
     def _on_press(self, event):
         """Handle mouse button press event."""
-        # Find the closest item that's tagged as draggable
+        # Only bound to draggable items, so the current item is a block
         item = self.find_withtag("current")
-        if item and "draggable" in self.gettags(item):
+        if item:
             # Store initial position and item
             self.drag_data["item"] = item
             self.drag_data["x"] = event.x
             self.drag_data["y"] = event.y
-            # Bring item to front
-            self.tag_raise(item)
+            # Bring the block (rectangle and text) to front
+            self.tag_raise(f"link_{self.block_map.get(item[0])}")
     
     def _on_release(self, event):
         """Handle mouse button release event."""
         # Reset the drag data
         if self.drag_data["item"]:
-            # Signal that the layout was manually changed
-            self.event_generate("<<LayoutChanged>>", when="tail")
+            # Apply motion still waiting for the idle callback before reporting the layout
+            self._flush_drag()
             self.drag_data["item"] = None
+            # Signal that the layout was manually changed
+            if self.on_layout_changed:
+                self.on_layout_changed()
     
     def _on_drag(self, event):
         """Handle mouse motion during drag."""
@@ -436,52 +759,61 @@ class BlockDiagramCanvas(tk.Canvas):
             link_name = self.block_map.get(item[0])
             
             if link_name:
-                # Move all items related to this link
-                for canvas_item, name in self.block_map.items():
-                    if name == link_name:
-                        self.move(canvas_item, dx, dy)
-                
-                # Update arrows connected to this link
-                self._update_connectors(link_name)
+                # Motion events are accumulated and applied once per idle pass
+                self._pending_link = link_name
+                self._pending_dx += dx
+                self._pending_dy += dy
+                if not self._drag_flush_scheduled:
+                    self._drag_flush_scheduled = True
+                    self.after_idle(self._flush_drag)
                 
                 # Update drag starting point
                 self.drag_data["x"] = event.x
                 self.drag_data["y"] = event.y
     
+    def _flush_drag(self):
+        """Move the dragged block by the motion accumulated since the last flush."""
+        self._drag_flush_scheduled = False
+        link_name = self._pending_link
+        dx, dy = self._pending_dx, self._pending_dy
+        self._pending_link = None
+        self._pending_dx = self._pending_dy = 0
+        if link_name is None or link_name not in self.by_name or not (dx or dy):
+            return
+        
+        # Move the block's rectangle and text, and keep its cached center in step
+        block, text_id, x, y = self.by_name[link_name]
+        self.move(block, dx, dy)
+        self.move(text_id, dx, dy)
+        self.by_name[link_name] = (block, text_id, x + dx, y + dy)
+        
+        # Update arrows connected to this link
+        self._update_connectors(link_name)
+    
     def _on_right_click(self, event):
         """Handle right-click event to add hardware interfaces."""
         # Find what item was clicked
         item = self.find_withtag("current")
         if item:
-            # Check if the item is associated with a joint
-            joint_obj = self.joint_items.get(item[0])
-            if joint_obj:
-                # Emit event to show dialog for adding hardware interface
-                self.event_generate("<<AddHardwareInterface>>", when="tail", 
-                                   data=joint_obj.name)
+            # Arrow items carry a joint_<name> tag naming their joint
+            for tag in self.gettags(item[0]):
+                if tag.startswith("joint_"):
+                    # Show the dialog for adding a hardware interface
+                    if self.on_add_hardware_interface:
+                        self.on_add_hardware_interface(tag[len("joint_"):])
+                    break
     
     def _update_connectors(self, link_name):
-        """Update arrow connectors when a block is moved."""
-        # This will be called from the URDFBlockDiagramApp class
-        # We need to remove all connectors and redraw them
-        self.delete("connector")
-        self.delete("connector_text")
-        self.delete("hw_block")
-        self.delete("hw_connector")
-        self.hardware_blocks = {}  # Reset hardware blocks mapping
-        
-        # The app needs to redraw all connectors
-        self.event_generate("<<UpdateConnectors>>", when="tail", data=link_name)
+        """Move the arrows attached to a block after the block has moved."""
+        for joint_obj in self.link_joints.get(link_name, ()):
+            self.update_arrow(joint_obj)
         
     def get_block_position(self, link_name):
-        """Get the current position of a block by link name."""
-        for item, name in self.block_map.items():
-            if name == link_name:
-                bbox = self.bbox(item)
-                if bbox:
-                    # Return center point of the block
-                    return ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
-        return None
+        """Get the current position (center point) of a block by link name."""
+        entry = self.by_name.get(link_name)
+        if entry is None:
+            return None
+        return entry[2], entry[3]
 
 
 class URDFBlockDiagramApp(tk.Tk):
@@ -496,15 +828,33 @@ class URDFBlockDiagramApp(tk.Tk):
         
         self.links = {}
         self.joints = []
+        self.joint_by_name = {}  # Maps joint names to Joint objects
         self.urdf_file = None
         
         # For layout calculation
         self.layout = {}  # Maps link name to (x, y) position
-        
-        # Bind custom events for draggable blocks
-        self.canvas.bind("<<LayoutChanged>>", self._on_layout_changed)
-        self.canvas.bind("<<UpdateConnectors>>", self._on_update_connectors)
-        self.canvas.bind("<<AddHardwareInterface>>", self._on_add_hardware_interface)
+        self._children = {}  # Maps link name to [(child link, joint)], built by _index_joints
+        self._viewport_refresh_id = None  # Pending after_idle call of _refresh_viewport
+        # Exports are written off the Tk thread, one at a time
+        self._export_pool = ThreadPoolExecutor(max_workers=1)
+        
+        # Callbacks for draggable blocks and joint arrows
+        self.canvas.on_layout_changed = self._on_layout_changed
+        self.canvas.on_add_hardware_interface = self._on_add_hardware_interface
+    
+    def setup_theme(self):
+        """Apply the Sun Valley dark theme."""
+        # Imported here so using URDFParser on its own doesn't load the theme package
+        import sv_ttk
+        sv_ttk.set_theme("dark")
+    
+    def _index_joints(self):
+        """Build the joint lookups for a newly loaded URDF."""
+        self.joint_by_name = {joint.name: joint for joint in self.joints}
+        # Children of each link, in joint order, so the layout doesn't rescan the joints per link
+        self._children = {}
+        for joint in self.joints:
+            self._children.setdefault(joint.parent, []).append((joint.child, joint))
     
     def open_urdf_from_path(self, path):
         """Open a URDF file from the given path."""
@@ -512,20 +862,22 @@ class URDFBlockDiagramApp(tk.Tk):
             self.status_var.set(f"Error: File not found: {path}")
             return
             
+        name = os.path.basename(path)
         try:
-            self.status_var.set(f"Loading {os.path.basename(path)}...")
+            self.status_var.set(f"Loading {name}...")
             self.update_idletasks()
             
             # Parse URDF
             parser = URDFParser(path)
             self.links = parser.links
             self.joints = parser.joints
+            self._index_joints()
             self.urdf_file = path
             
             # Generate and display diagram
             self.generate_diagram()
             
-            self.status_var.set(f"Loaded {os.path.basename(path)}: {len(self.links)} links, {len(self.joints)} joints")
+            self.status_var.set(f"Loaded {name}: {len(self.links)} links, {len(self.joints)} joints")
             
         except Exception as e:
             self.status_var.set(f"Error: {str(e)}")
@@ -566,12 +918,14 @@ class URDFBlockDiagramApp(tk.Tk):
         )
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        h_scrollbar.config(command=self.canvas.xview)
-        v_scrollbar.config(command=self.canvas.yview)
+        h_scrollbar.config(command=self._xview)
+        v_scrollbar.config(command=self._yview)
         
         # Enable canvas scrolling with mouse wheel
         self.canvas.bind("<MouseWheel>", self._on_mousewheel_y)
         self.canvas.bind("<Shift-MouseWheel>", self._on_mousewheel_x)
+        # Only blocks near the visible area are drawn; resizing shows more or fewer
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
         
         # Status bar
         self.status_var = tk.StringVar()
@@ -583,37 +937,85 @@ class URDFBlockDiagramApp(tk.Tk):
     def _on_mousewheel_y(self, event):
         """Handle vertical scrolling with mouse wheel."""
         self.canvas.yview_scroll(-1 * (event.delta // 120), "units")
+        self._schedule_viewport_refresh()
     
     def _on_mousewheel_x(self, event):
         """Handle horizontal scrolling with mouse wheel."""
         self.canvas.xview_scroll(-1 * (event.delta // 120), "units")
+        self._schedule_viewport_refresh()
+    
+    def _xview(self, *args):
+        """Scroll the canvas horizontally from the scrollbar."""
+        self.canvas.xview(*args)
+        self._schedule_viewport_refresh()
+    
+    def _yview(self, *args):
+        """Scroll the canvas vertically from the scrollbar."""
+        self.canvas.yview(*args)
+        self._schedule_viewport_refresh()
+    
+    def _on_canvas_configure(self, event):
+        """Handle the canvas being resized."""
+        self._schedule_viewport_refresh()
+    
+    def _schedule_viewport_refresh(self):
+        """Refresh the drawn blocks once the pending scroll/resize events are handled."""
+        if self._viewport_refresh_id is None:
+            self._viewport_refresh_id = self.after_idle(self._refresh_viewport)
+    
+    def _refresh_viewport(self):
+        """Draw the blocks near the visible area and delete the ones that scrolled away.
+        
+        Large URDFs would otherwise create thousands of canvas items. A block is kept
+        while its center is within one column spacing of the view; arrows are drawn
+        when both of their blocks are.
+        """
+        self._viewport_refresh_id = None
+        canvas = self.canvas
+        pad = canvas.spacing_x
+        x0 = canvas.canvasx(0) - pad
+        y0 = canvas.canvasy(0) - pad
+        x1 = canvas.canvasx(canvas.winfo_width()) + pad
+        y1 = canvas.canvasy(canvas.winfo_height()) + pad
+        # Never delete the block under the mouse in the middle of a drag
+        dragging = canvas.drag_data["item"] is not None
+        
+        for link_name, link in self.links.items():
+            pos = canvas.get_block_position(link_name) or self.layout.get(link_name)
+            if pos is None:
+                continue
+            x, y = pos
+            visible = x0 <= x <= x1 and y0 <= y <= y1
+            if link_name in canvas.by_name:
+                if not visible and not dragging:
+                    canvas.remove_block(link_name)
+            elif visible:
+                canvas.draw_block(x, y, link.label, "link", link_name=link_name)
+        
+        # Draw joints (connections)
+        self._draw_connections()
+    
+    def _diagram_bounds(self, positions=None):
+        """Get the area (x0, y0, x1, y1) covering every block in the layout, or in positions."""
+        if positions is None:
+            positions = self.layout.values()
+        xs = [x for x, _ in positions]
+        ys = [y for _, y in positions]
+        # Leave room for the arrow labels and hardware blocks below the lowest blocks
+        return (min(xs) - self.canvas.block_width, min(ys) - self.canvas.block_height,
+                max(xs) + self.canvas.block_width, max(ys) + 2 * self.canvas.block_height)
     
     def open_urdf(self):
         """Open and parse a URDF file."""
+        from tkinter import filedialog
         filename = filedialog.askopenfilename(
             filetypes=[("URDF files", "*.urdf"), ("XML files", "*.xml"), ("All files", "*.*")]
         )
         
         if not filename:
             return
-            
-        try:
-            self.status_var.set(f"Loading {os.path.basename(filename)}...")
-            self.update_idletasks()
-            
-            # Parse URDF
-            parser = URDFParser(filename)
-            self.links = parser.links
-            self.joints = parser.joints
-            self.urdf_file = filename
-            
-            # Generate and display diagram
-            self.generate_diagram()
-            
-            self.status_var.set(f"Loaded {os.path.basename(filename)}: {len(self.links)} links, {len(self.joints)} joints")
-            
-        except Exception as e:
-            self.status_var.set(f"Error: {str(e)}")
+        
+        self.open_urdf_from_path(filename)
     
     def generate_diagram(self):
         """Generate and display the block diagram based on the loaded URDF."""
@@ -621,54 +1023,49 @@ class URDFBlockDiagramApp(tk.Tk):
             return
             
         # Clear canvas
-        self.canvas.delete("all")
-        self.canvas.block_map = {}  # Reset block mapping
-        self.canvas.joint_items = {}  # Reset joint mapping
-        self.canvas.hardware_blocks = {}  # Reset hardware blocks
+        self.canvas.clear_diagram()
         
         # Calculate layout
         self._calculate_layout()
         
-        # Draw links
-        for link_name, link in self.links.items():
-            if link_name in self.layout:
-                x, y = self.layout[link_name]
-                self.canvas.draw_block(x, y, str(link), "link", link_name=link_name)
-        
-        # Draw joints (connections)
-        self._draw_connections()
+        # Configure canvas scrolling region from the layout, since off-screen blocks aren't drawn
+        if self.layout:
+            self.canvas.config(scrollregion=self._diagram_bounds())
         
-        # Configure canvas scrolling region
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+        # Draw the links and joints in view
+        self._refresh_viewport()
         
         # Add a tip about dragging and right-clicking
         self.status_var.set("Tip: Drag blocks to rearrange layout. Right-click on joints to add hardware interfaces.")
     
     def _draw_connections(self):
-        """Draw all joint connections between links."""
+        """Draw the joint connections between drawn links that don't have an arrow yet."""
+        pending = []
+        centers = []
         for joint in self.joints:
-            if joint.parent in self.layout and joint.child in self.layout:
+            if joint.name not in self.canvas.arrows:
                 parent_pos = self.canvas.get_block_position(joint.parent)
                 child_pos = self.canvas.get_block_position(joint.child)
                 
-                if not parent_pos:
-                    parent_pos = self.layout[joint.parent]
-                
-                if not child_pos:
-                    child_pos = self.layout[joint.child]
-                
-                # Draw the connecting arrow with interface info
-                self.canvas.draw_arrow(
-                    parent_pos[0], parent_pos[1], 
-                    child_pos[0], child_pos[1], 
-                    joint.joint_type,
-                    joint.name,
-                    joint.state_interfaces,
-                    joint.command_interfaces,
-                    joint
-                )
-    
-    def _on_layout_changed(self, event):
+                if not parent_pos or not child_pos:
+                    continue
+                pending.append(joint)
+                centers.append((*parent_pos, *child_pos))
+        
+        # Compute all arrow endpoints in one pass before creating the items
+        for joint, pair, points in zip(pending, centers, self.canvas.arrow_points_batch(centers)):
+            # Draw the connecting arrow with interface info
+            self.canvas.draw_arrow(
+                *pair,
+                joint.joint_type,
+                joint.name,
+                joint.state_interfaces,
+                joint.command_interfaces,
+                joint,
+                points
+            )
+    
+    def _on_layout_changed(self):
         """Handle layout changes from manual dragging."""
         # Update the layout dictionary with current positions
         for link_name in self.links:
@@ -676,36 +1073,29 @@ class URDFBlockDiagramApp(tk.Tk):
             if pos:
                 self.layout[link_name] = pos
         
+        # The dragged block may have left the view
+        self._schedule_viewport_refresh()
         self.status_var.set("Layout updated manually")
     
-    def _on_update_connectors(self, event):
-        """Update connectors after a block has been moved."""
-        self._draw_connections()
-    
-    def _on_add_hardware_interface(self, event):
+    def _on_add_hardware_interface(self, joint_name):
         """Handle adding a hardware interface to a joint."""
-        joint_name = event.data
-        
         # Find the joint object
-        joint = None
-        for j in self.joints:
-            if j.name == joint_name:
-                joint = j
-                break
-        
+        joint = self.joint_by_name.get(joint_name)
         if not joint:
             return
         
         # Show dialog to get hardware interface
+        from tkinter import simpledialog
         hw_interface = simpledialog.askstring(
             "Add Hardware Interface",
             f"Enter hardware interface for joint {joint_name}:",
-            initialvalue=", ".join(joint.hardware_interfaces) if joint.hardware_interfaces else ""
+            initialvalue=joint.hardware_str
         )
         
         if hw_interface:
             # Update the joint's hardware interfaces
             joint.hardware_interfaces = [iface.strip() for iface in hw_interface.split(",") if iface.strip()]
+            joint.update_labels()
             
             # Update the diagram
             self.canvas.update_hardware_interface_block(joint)
@@ -720,9 +1110,21 @@ class URDFBlockDiagramApp(tk.Tk):
         
         # Clear the layout
         self.layout = {}
+        self._calculate_layout()
+        
+        # Move the blocks and arrows already drawn instead of deleting and recreating them
+        canvas = self.canvas
+        for link_name in list(canvas.by_name):
+            if link_name in self.layout:
+                canvas.move_block(link_name, *self.layout[link_name])
+        for joint in self.joints:
+            if joint.name in canvas.arrows:
+                canvas.update_arrow(joint)
         
-        # Recalculate and redraw
-        self.generate_diagram()
+        if self.layout:
+            canvas.config(scrollregion=self._diagram_bounds())
+        # Draw what moved into view and delete what moved out of it
+        self._refresh_viewport()
         
         self.status_var.set("Layout reset to automatic tree layout")
     
@@ -737,33 +1139,24 @@ class URDFBlockDiagramApp(tk.Tk):
         
         if not root_links and self.links:
             # If no root found, just use the first link
-            root_links = [list(self.links.keys())[0]]
+            root_links = [next(iter(self.links))]
         
-        # Use a tree layout algorithm (simple version)
+        # Use a tree layout algorithm (simple version), walking each tree depth-first
+        margin = self.canvas.margin
+        spacing_x = self.canvas.spacing_x
+        spacing_y = self.canvas.spacing_y
         for i, root in enumerate(root_links):
-            self._layout_subtree(root, 0, i * self.canvas.spacing_y * 2)
-    
-    def _layout_subtree(self, link_name, depth, y_offset):
-        """Recursively layout a subtree starting at the given link."""
-        # Skip if this link already has a position
-        if link_name in self.layout:
-            return
-            
-        # Position this link
-        x = self.canvas.margin + depth * self.canvas.spacing_x
-        y = self.canvas.margin + y_offset
-        self.layout[link_name] = (x, y)
-        
-        # Find all children of this link
-        children = []
-        for joint in self.joints:
-            if joint.parent == link_name:
-                children.append((joint.child, joint))
-        
-        # Layout each child subtree
-        for i, (child, _) in enumerate(children):
-            child_y_offset = y_offset + i * self.canvas.spacing_y
-            self._layout_subtree(child, depth + 1, child_y_offset)
+            stack = [(root, 0, i * spacing_y * 2)]
+            while stack:
+                link_name, depth, y_offset = stack.pop()
+                # Skip if this link already has a position
+                if link_name in self.layout:
+                    continue
+                self.layout[link_name] = (margin + depth * spacing_x, margin + y_offset)
+                # Pushed last child first, so children are visited in joint order
+                children = self._children.get(link_name, ())
+                for j in range(len(children) - 1, -1, -1):
+                    stack.append((children[j][0], depth + 1, y_offset + j * spacing_y))
     
     def export_diagram(self):
         """Export the diagram as a PostScript file."""
@@ -771,14 +1164,53 @@ class URDFBlockDiagramApp(tk.Tk):
             self.status_var.set("No diagram to export")
             return
             
+        from tkinter import filedialog
         filename = filedialog.asksaveasfilename(
             defaultextension=".ps",
             filetypes=[("PostScript", "*.ps"), ("All files", "*.*")]
         )
         
         if filename:
-            self.canvas.postscript(file=filename, colormode='color')
-            self.status_var.set(f"Diagram exported to {os.path.basename(filename)}")
+            # Generated from the layout rather than canvas.postscript(), which only sees drawn items
+            blocks = []
+            positions = {}
+            for link_name, link in self.links.items():
+                pos = self.canvas.get_block_position(link_name) or self.layout.get(link_name)
+                if pos is not None:
+                    positions[link_name] = pos
+                    blocks.append((*pos, link.label))
+            arrows = [(*positions[joint.parent], *positions[joint.child], joint) for joint in self.joints
+                      if joint.parent in positions and joint.child in positions]
+            # The positions are snapshotted here; rendering and writing don't touch Tk
+            future = self._export_pool.submit(
+                self._write_postscript, filename, blocks, arrows, self._diagram_bounds(positions.values()))
+            name = os.path.basename(filename)
+            self.status_var.set(f"Exporting {name}...")
+            self.after(EXPORT_POLL_MS, self._poll_export, future, name)
+    
+    def _write_postscript(self, filename, blocks, arrows, bounds):
+        """Render the diagram and write it to filename. Runs on the export thread."""
+        document = self.canvas.diagram_postscript(blocks, arrows, bounds)
+        with open(filename, 'wb') as f:
+            f.write(document)
+    
+    def _poll_export(self, future, name):
+        """Report the result of a background export of the file called name once it has finished."""
+        if not future.done():
+            self.after(EXPORT_POLL_MS, self._poll_export, future, name)
+            return
+        error = future.exception()
+        if error is not None:
+            self.status_var.set(f"Error: {error}")
+        else:
+            self.status_var.set(f"Diagram exported to {name}")
+
+
+def _existing_file(path):
+    """argparse type for the URDF argument: fail before any window opens if it doesn't exist."""
+    if not os.path.isfile(path):
+        raise argparse.ArgumentTypeError(f"file not found: {path}")
+    return path
 
 
 def main():
@@ -789,6 +1221,7 @@ def main():
     parser.add_argument(
         "urdf_file", 
         nargs="?",
+        type=_existing_file,
         help="Path to the URDF file"
     )
     
@@ -796,13 +1229,13 @@ def main():
     
     app = URDFBlockDiagramApp()
     
-    # If a file was provided as an argument, load it
+    # This is where the magic happens, once the window has been shown with the default theme
+    app.after_idle(app.setup_theme)
+    
+    # If a file was provided as an argument, load it as soon as the event loop starts
     if args.urdf_file:
-        app.after(100, lambda: app.open_urdf_from_path(args.urdf_file))
+        app.after(0, app.open_urdf_from_path, args.urdf_file)
     
-
-    # This is where the magic happens
-    sv_ttk.set_theme("dark")
     app.mainloop()
 
 
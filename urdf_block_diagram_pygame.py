@@ -7,7 +7,8 @@ Converts URDF files into visual block diagrams showing the robot's joint/link st
 import sys
 import os
 import argparse
-import xml.etree.ElementTree as ET
+import copy
+import functools
 import math
 import pygame
 from dataclasses import dataclass
@@ -15,6 +16,25 @@ from typing import List, Dict, Tuple, Optional
 import tkinter as tk
 from tkinter import filedialog, simpledialog
 
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:  # lxml is optional; the standard library parser is slower but equivalent
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; arrows are then hit-tested one at a time
+    np = None
+
+# Distance in pixels within which a click hits an arrow
+ARROW_HIT_DISTANCE = 10
+# With fewer arrows than this, hit-testing them one at a time beats setting up numpy arrays
+ARROW_BATCH_THRESHOLD = 64
+# How far off screen an arrow's line may start and still be drawn
+ARROW_CULL_MARGIN = 10
+
 
 @dataclass
 class Link:
@@ -94,92 +114,30 @@ class Joint:
 class URDFParser:
     """Parse URDF XML files and extract link and joint information."""
     
-    def __init__(self, urdf_file: str):
-        """Initialize with URDF file path."""
+    def __init__(self, urdf_file: Optional[str] = None, xml_root=None):
+        """Initialize with URDF file path, or with the <robot> element of an already parsed URDF."""
+        if urdf_file is None and xml_root is None:
+            raise ValueError("URDFParser needs a urdf_file or an xml_root")
         self.urdf_file = urdf_file
+        self.xml_root = xml_root
         self.links: Dict[str, Link] = {}
         self.joints: List[Joint] = []
+        # Joint lookups, filled in by index_joints() once the joints have been read
+        self.parent_to_joints: Dict[str, List[Joint]] = {}
+        self.child_to_joint: Dict[str, Joint] = {}
+        self.child_link_set: frozenset = frozenset()
         self.parse()
     
     def parse(self):
         """Parse the URDF file."""
         try:
-            tree = ET.parse(self.urdf_file)
-            root = tree.getroot()
-            
-            # Parse links
-            for link_elem in root.findall('link'):
-                name = link_elem.get('name')
-                visual = len(link_elem.findall('visual')) > 0
-                collision = len(link_elem.findall('collision')) > 0
-                inertial = link_elem.find('inertial') is not None
-                
-                self.links[name] = Link(name, visual, collision, inertial)
-            
-            # Parse joints
-            for joint_elem in root.findall('joint'):
-                name = joint_elem.get('name')
-                joint_type = joint_elem.get('type')
-                
-                parent_elem = joint_elem.find('parent')
-                child_elem = joint_elem.find('child')
-                
-                if parent_elem is not None and child_elem is not None:
-                    parent = parent_elem.get('link')
-                    child = child_elem.get('link')
-                    
-                    # Parse axis if present
-                    axis = None
-                    axis_elem = joint_elem.find('axis')
-                    if axis_elem is not None:
-                        xyz = axis_elem.get('xyz')
-                        if xyz:
-                            axis = tuple(map(float, xyz.split()))
-                    
-                    # Parse limits if present
-                    limit = None
-                    limit_elem = joint_elem.find('limit')
-                    if limit_elem is not None:
-                        limit = {}
-                        for attr in ['lower', 'upper', 'effort', 'velocity']:
-                            val = limit_elem.get(attr)
-                            if val:
-                                limit[attr] = float(val)
-                    
-                    # Look for state and command interfaces (custom extension)
-                    state_interfaces = []
-                    command_interfaces = []
-                    
-                    # Check for ros2_control tag first (common in ROS 2 URDF files)
-                    ros2_control = joint_elem.find('./ros2_control')
-                    if ros2_control is not None:
-                        state_interfaces_elem = ros2_control.find('./state_interfaces')
-                        if state_interfaces_elem is not None:
-                            for interface in state_interfaces_elem.findall('./interface'):
-                                state_interfaces.append(interface.get('name'))
-                        
-                        command_interfaces_elem = ros2_control.find('./command_interfaces')
-                        if command_interfaces_elem is not None:
-                            for interface in command_interfaces_elem.findall('./interface'):
-                                command_interfaces.append(interface.get('name'))
-                    
-                    # Also check for gazebo ros_control plugin tags
-                    gazebo = joint_elem.find('./gazebo')
-                    if gazebo is not None:
-                        plugin = gazebo.find('./plugin[@name="gazebo_ros_control"]')
-                        if plugin is not None:
-                            state_ifaces = plugin.find('./state_interface')
-                            if state_ifaces is not None and state_ifaces.text:
-                                state_interfaces = state_ifaces.text.split()
-                            
-                            command_ifaces = plugin.find('./command_interface')
-                            if command_ifaces is not None and command_ifaces.text:
-                                command_interfaces = command_interfaces.text.split()
-                                
-                    self.joints.append(Joint(
-                        name, joint_type, parent, child, 
-                        axis, limit, state_interfaces, command_interfaces
-                    ))
+            # Links and joints are handled as soon as each element has been read
+            for elem in self._iter_elements():
+                if elem.tag == 'link':
+                    self._parse_link(elem)
+                else:
+                    self._parse_joint(elem)
+            self.index_joints()
             
         except ET.ParseError as e:
             print(f"Error parsing URDF file: {e}")
@@ -187,11 +145,172 @@ class URDFParser:
         except Exception as e:
             print(f"Unexpected error: {e}")
             sys.exit(1)
+    
+    def index_joints(self):
+        """Rebuild the parent/child joint lookups from self.joints."""
+        self.parent_to_joints = {}
+        for joint in self.joints:
+            self.parent_to_joints.setdefault(joint.parent, []).append(joint)
+        # A link with several parent joints maps to the last of them
+        self.child_to_joint = {joint.child: joint for joint in self.joints}
+        self.child_link_set = frozenset(self.child_to_joint)
+    
+    def _iter_elements(self):
+        """Stream the <link> and <joint> elements directly under <robot>.
+        
+        Each element is freed once the caller has moved on to the next one, so memory
+        use doesn't grow with the size of the file. A tree passed in as xml_root is
+        read as it is and left intact.
+        """
+        if self.xml_root is not None:
+            for elem in self.xml_root:
+                if elem.tag in ('link', 'joint'):
+                    yield elem
+            return
+        
+        if LXML_AVAILABLE:
+            # libxml2 does the tag filtering, so only link/joint elements reach Python.
+            # Whitespace-only text isn't kept, and huge_tree lifts libxml2's size limits.
+            for _, elem in ET.iterparse(self.urdf_file, events=('end',), tag=('link', 'joint'),
+                                        remove_blank_text=True, huge_tree=True):
+                parent = elem.getparent()
+                if parent is None or parent.getparent() is not None:
+                    continue  # A nested reference, e.g. <transmission><joint>
+                yield elem
+                elem.clear()
+                # Drop everything before this element, parsed or not (<gazebo>, <material>, ...)
+                while elem.getprevious() is not None:
+                    del parent[0]
+            return
+        
+        depth = 0
+        root = None
+        for event, elem in ET.iterparse(self.urdf_file, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                if elem.tag in ('link', 'joint'):
+                    yield elem
+                # Children of <robot> are removed as they end, so this is always the first one
+                root.remove(elem)
+    
+    def _parse_link(self, link_elem):
+        """Add the link described by a <link> element."""
+        name = link_elem.get('name')
+        # One walk over the children instead of a find() per element
+        tags = {child.tag for child in link_elem}
+        
+        self.links[name] = Link(name, 'visual' in tags, 'collision' in tags, 'inertial' in tags)
+    
+    def _parse_joint(self, joint_elem):
+        """Add the joint described by a <joint> element, if it names its parent and child."""
+        name = joint_elem.get('name')
+        joint_type = joint_elem.get('type')
+        
+        # One walk over the children instead of a find() per element
+        children = _first_children(joint_elem)
+        parent_elem = children.get('parent')
+        child_elem = children.get('child')
+        if parent_elem is None or child_elem is None:
+            return
+        parent = parent_elem.get('link')
+        child = child_elem.get('link')
+        
+        # Parse axis if present
+        axis = None
+        axis_elem = children.get('axis')
+        if axis_elem is not None:
+            xyz = axis_elem.get('xyz')
+            if xyz:
+                axis = tuple(map(float, xyz.split()))
+        
+        # Parse limits if present
+        limit = None
+        limit_elem = children.get('limit')
+        if limit_elem is not None:
+            limit = {}
+            for attr in ['lower', 'upper', 'effort', 'velocity']:
+                val = limit_elem.get(attr)
+                if val:
+                    limit[attr] = float(val)
+        
+        # Look for state and command interfaces (custom extension)
+        state_interfaces = []
+        command_interfaces = []
+        
+        # Check for ros2_control tag first (common in ROS 2 URDF files)
+        ros2_control = children.get('ros2_control')
+        if ros2_control is not None:
+            sections = _first_children(ros2_control)
+            if 'state_interfaces' in sections:
+                state_interfaces = _interface_names(sections['state_interfaces'])
+            if 'command_interfaces' in sections:
+                command_interfaces = _interface_names(sections['command_interfaces'])
+        
+        # Also check for gazebo ros_control plugin tags
+        gazebo = children.get('gazebo')
+        if gazebo is not None:
+            plugin = next((elem for elem in gazebo
+                           if elem.tag == 'plugin' and elem.get('name') == 'gazebo_ros_control'), None)
+            if plugin is not None:
+                plugin_children = _first_children(plugin)
+                state_ifaces = plugin_children.get('state_interface')
+                if state_ifaces is not None and state_ifaces.text:
+                    state_interfaces = state_ifaces.text.split()
+                
+                command_ifaces = plugin_children.get('command_interface')
+                if command_ifaces is not None and command_ifaces.text:
+                    command_interfaces = command_ifaces.text.split()
+        
+        self.joints.append(Joint(
+            name, joint_type, parent, child, 
+            axis, limit, state_interfaces, command_interfaces
+        ))
+
+
+def _first_children(elem) -> dict:
+    """Map each child tag to the first child with that tag (what elem.find(tag) would return)."""
+    children = {}
+    for child in elem:
+        children.setdefault(child.tag, child)
+    return children
+
+
+def _interface_names(elem) -> List[str]:
+    """Names of the <interface> children of a ros2_control interfaces element."""
+    return [child.get('name') for child in elem if child.tag == 'interface']
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_cached(path, mtime_ns, size):
+    """Parse a URDF once per (path, modification time, size); see parse_urdf()."""
+    return URDFParser(path)
+
+
+def parse_urdf(path):
+    """Get a parsed URDF, reusing the last parse if the file hasn't changed.
+    
+    The result is a copy with its own joints, so editing their hardware interfaces
+    doesn't affect later loads.
+    """
+    st = os.stat(path)
+    parser = copy.copy(_parse_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size))
+    parser.links = dict(parser.links)
+    parser.joints = [copy.copy(joint) for joint in parser.joints]
+    parser.index_joints()
+    return parser
 
 
 class DrawableBlock:
     """Represents a drawable block (link or hardware interface) on the canvas."""
     
+    # One per link and hardware interface, so no per-instance __dict__
+    __slots__ = ('x', 'y', 'width', 'height', 'text', 'block_type', 'link_name', 'selected', 'dragging')
+    
     def __init__(self, x, y, width, height, text, block_type="link", link_name=None):
         self.x = x
         self.y = y
@@ -221,19 +340,31 @@ class DrawableBlock:
 class DrawableArrow:
     """Represents a drawable arrow (joint connection) on the canvas."""
     
+    __slots__ = ('start_x', 'start_y', 'end_x', 'end_y', 'joint_obj', 'line', 'head', 'labels', 'label_box')
+    
     def __init__(self, start_x, start_y, end_x, end_y, joint_obj):
         self.start_x = start_x
         self.start_y = start_y
         self.end_x = end_x
         self.end_y = end_y
         self.joint_obj = joint_obj
+        # Drawing data worked out by the app when the arrow or its joint changes
+        self.line = None  # Shortened line, direction and midpoint; see _update_arrow_geometry()
+        self.head = None  # Arrowhead corners at the end of the shortened line
+        self.labels = []  # (surface, x, y offset from the midpoint); see _update_arrow_labels()
+        self.label_box = (0, 0, 0, 0)  # Left, top, right, bottom of the labels relative to the midpoint
         
     def get_midpoint(self):
         """Get the midpoint of the arrow."""
         return ((self.start_x + self.end_x) // 2, (self.start_y + self.end_y) // 2)
     
-    def contains_point(self, x, y, threshold=10):
+    def contains_point(self, x, y, threshold=ARROW_HIT_DISTANCE):
         """Check if point is near the arrow line."""
+        # Points outside the segment's bounding box grown by threshold can't be near it
+        if (x < min(self.start_x, self.end_x) - threshold or x > max(self.start_x, self.end_x) + threshold or
+                y < min(self.start_y, self.end_y) - threshold or y > max(self.start_y, self.end_y) + threshold):
+            return False
+        
         # Simple distance from point to line segment
         A = self.end_x - self.start_x
         B = self.end_y - self.start_y
@@ -258,9 +389,9 @@ class DrawableArrow:
         
         dx = x - xx
         dy = y - yy
-        distance = math.sqrt(dx * dx + dy * dy)
         
-        return distance <= threshold
+        # Compared squared, which saves the sqrt
+        return dx * dx + dy * dy <= threshold * threshold
 
 
 class URDFBlockDiagramApp:
@@ -294,6 +425,14 @@ class URDFBlockDiagramApp:
             'button_hover': (90, 90, 90),
             'button_text': (255, 255, 255)
         }
+        # Arrow colors by joint type; other types use COLORS['default_joint']
+        self._joint_colors = {joint_type: self.COLORS[joint_type] for joint_type in ('revolute', 'prismatic', 'fixed')}
+        # Block (fill, outline) colors by block type; other types use the joint colors
+        self._block_colors = {
+            'link': (self.COLORS['link_fill'], self.COLORS['link_outline']),
+            'hardware': (self.COLORS['hw_fill'], self.COLORS['hw_outline']),
+        }
+        self._default_block_colors = (self.COLORS['joint_fill'], self.COLORS['joint_outline'])
         
         # Layout settings
         self.block_width = 120
@@ -309,15 +448,33 @@ class URDFBlockDiagramApp:
         # Data
         self.links = {}
         self.joints = []
+        self.parent_to_joints = {}  # Joint lookups from the parser
+        self.child_link_set = frozenset()
         self.urdf_file = None
         
         # Drawable objects
         self.drawable_blocks = []  # List of DrawableBlock objects
         self.drawable_arrows = []  # List of DrawableArrow objects
         self.layout = {}  # Maps link name to (x, y) position
+        self._arrows_by_link = {}  # Maps link name to the indices in drawable_arrows of the arrows touching it
+        self._arrow_coords = None  # numpy (start_x, start_y, end_x, end_y) rows for drawable_arrows, if batched
+        self._hw_blocks = {}  # Maps joint name to its hardware interface block
+        self._block_grid = {}  # Maps (column, row) grid cell to the link blocks overlapping it
+        self._link_rank = {}  # Maps link name to its position in self.links, the order blocks are hit-tested in
+        
+        # Pre-rendered surfaces, reused every frame; see _block_surface(), _block_chrome(),
+        # _label_surface() and _text_lines()
+        self._block_surf_cache = {}
+        self._chrome_cache = {}
+        self._label_cache = {}
+        self._wrap_cache = {}
+        self._status_cache = (None, None)  # (status_text, its rendered surface)
         
         # Interaction state
         self.dragging_block = None
+        # Frame drawn up to just below the dragged block, and that block's index; see draw()
+        self._drag_background = None
+        self._drag_index = 0
         self.drag_offset_x = 0
         self.drag_offset_y = 0
         self.last_mouse_x = 0
@@ -331,12 +488,21 @@ class URDFBlockDiagramApp:
         self.font = pygame.font.Font(None, 24)
         self.small_font = pygame.font.Font(None, 18)
         self.button_font = pygame.font.Font(None, 20)
+        self._render_buttons()
         
         # Status
         self.status_text = "Ready - Right-click on joints to add hardware interfaces"
         
         # Clock for FPS control
         self.clock = pygame.time.Clock()
+        # Set when the screen may be out of date; run() only redraws then
+        self._needs_redraw = True
+        # Screen areas to repaint when nothing else changed (buttons the pointer moved onto or off)
+        self._dirty_rects = []
+        self._hover_button = None
+        
+        # Hidden Tk root that owns the file and input dialogs; see _dialog_parent()
+        self._tk_root = None
         
     def setup_ui(self):
         """Setup UI buttons."""
@@ -362,6 +528,20 @@ class URDFBlockDiagramApp:
             }
         ]
     
+    def _render_buttons(self):
+        """Pre-render each button in its normal and hover colors, so drawing one is a single blit."""
+        for button in self.buttons:
+            for key, color in (('surf_normal', self.COLORS['button']), ('surf_hover', self.COLORS['button_hover'])):
+                surface = pygame.Surface(button['rect'].size).convert()
+                rect = surface.get_rect()
+                pygame.draw.rect(surface, color, rect)
+                pygame.draw.rect(surface, self.COLORS['button_text'], rect, 2)
+                
+                # Draw button text
+                text_surface = self.button_font.render(button['text'], True, self.COLORS['button_text'])
+                surface.blit(text_surface, text_surface.get_rect(center=rect.center))
+                button[key] = surface
+    
     def open_urdf_from_path(self, path):
         """Open a URDF file from the given path."""
         if not os.path.exists(path):
@@ -372,9 +552,11 @@ class URDFBlockDiagramApp:
             self.status_text = f"Loading {os.path.basename(path)}..."
             
             # Parse URDF
-            parser = URDFParser(path)
+            parser = parse_urdf(path)
             self.links = parser.links
             self.joints = parser.joints
+            self.parent_to_joints = parser.parent_to_joints
+            self.child_link_set = parser.child_link_set
             self.urdf_file = path
             
             # Generate and display diagram
@@ -387,19 +569,21 @@ class URDFBlockDiagramApp:
     
     def open_urdf(self):
         """Open and parse a URDF file using file dialog."""
-        # Create a temporary tkinter root for file dialog
-        root = tk.Tk()
-        root.withdraw()  # Hide the main window
-        
         filename = filedialog.askopenfilename(
+            parent=self._dialog_parent(),
             filetypes=[("URDF files", "*.urdf"), ("XML files", "*.xml"), ("All files", "*.*")]
         )
         
-        root.destroy()  # Clean up
-        
         if filename:
             self.open_urdf_from_path(filename)
     
+    def _dialog_parent(self):
+        """Return the hidden Tk root for dialogs, creating it the first time one is shown."""
+        if self._tk_root is None:
+            self._tk_root = tk.Tk()
+            self._tk_root.withdraw()  # Hide the main window
+        return self._tk_root
+    
     def generate_diagram(self):
         """Generate and display the block diagram based on the loaded URDF."""
         if not self.links or not self.joints:
@@ -408,6 +592,12 @@ class URDFBlockDiagramApp:
         # Clear previous diagram
         self.drawable_blocks = []
         self.drawable_arrows = []
+        self.dragging_block = None
+        self._block_grid = {}
+        self._link_rank = {}
+        self._block_surf_cache.clear()
+        self._label_cache.clear()
+        self._wrap_cache.clear()
         
         # Calculate layout
         self._calculate_layout()
@@ -419,69 +609,155 @@ class URDFBlockDiagramApp:
                 block = DrawableBlock(x, y, self.block_width, self.block_height, 
                                     str(link), "link", link_name)
                 self.drawable_blocks.append(block)
+                self._link_rank[link_name] = len(self._link_rank)
+                for cell in self._grid_cells(x, y, block):
+                    self._block_grid.setdefault(cell, []).append(block)
         
         # Create drawable arrows for joints
         self._create_arrows()
         
         self.status_text = "Tip: Drag blocks to rearrange layout. Right-click on joints to add hardware interfaces."
     
+    def _grid_cells(self, x, y, block):
+        """Return the grid cells overlapped by block's rectangle when centred at (x, y)."""
+        cell = self.spacing_x
+        left = x - block.width//2
+        top = y - block.height//2
+        return [(col, row)
+                for col in range(left // cell, (left + block.width - 1) // cell + 1)
+                for row in range(top // cell, (top + block.height - 1) // cell + 1)]
+    
     def _create_arrows(self):
-        """Create drawable arrows for all joints."""
+        """Create drawable arrows for all joints, with their hardware interface blocks."""
         self.drawable_arrows = []
+        self._arrows_by_link = {}
+        self._hw_blocks = {}
+        # Hardware blocks from an earlier build are recreated below
+        self.drawable_blocks = [block for block in self.drawable_blocks if block.block_type != "hardware"]
         
+        layout = self.layout
         for joint in self.joints:
-            if joint.parent in self.layout and joint.child in self.layout:
-                parent_pos = self.layout[joint.parent]
-                child_pos = self.layout[joint.child]
-                
+            parent_pos = layout.get(joint.parent)
+            child_pos = layout.get(joint.child)
+            if parent_pos is not None and child_pos is not None:
                 arrow = DrawableArrow(parent_pos[0], parent_pos[1], 
                                     child_pos[0], child_pos[1], joint)
+                self._update_arrow_geometry(arrow)
+                self._update_arrow_labels(arrow)
+                index = len(self.drawable_arrows)
                 self.drawable_arrows.append(arrow)
+                self._arrows_by_link.setdefault(joint.parent, []).append(index)
+                self._arrows_by_link.setdefault(joint.child, []).append(index)
                 
                 # Create hardware interface blocks if needed
-                if joint.hardware_interfaces:
-                    mid_x, mid_y = arrow.get_midpoint()
-                    hw_block = DrawableBlock(mid_x, mid_y + 60, self.block_width, 
-                                           self.block_height//2, 
-                                           f"Hardware: {', '.join(joint.hardware_interfaces)}", 
-                                           "hardware", f"hw_{joint.name}")
-                    self.drawable_blocks.append(hw_block)
+                self._update_hardware_block(arrow)
+        
+        if np is not None and len(self.drawable_arrows) >= ARROW_BATCH_THRESHOLD:
+            self._arrow_coords = np.array(
+                [(a.start_x, a.start_y, a.end_x, a.end_y) for a in self.drawable_arrows], dtype=np.float64)
+        else:
+            self._arrow_coords = None
+    
+    def _update_hardware_block(self, arrow):
+        """Create, move, relabel or remove the hardware interface block under an arrow."""
+        joint = arrow.joint_obj
+        hw_block = self._hw_blocks.get(joint.name)
+        if not joint.hardware_interfaces:
+            if hw_block is not None:
+                self.drawable_blocks.remove(hw_block)
+                del self._hw_blocks[joint.name]
+            return
+        
+        mid_x, mid_y = arrow.get_midpoint()
+        text = f"Hardware: {', '.join(joint.hardware_interfaces)}"
+        if hw_block is None:
+            hw_block = DrawableBlock(mid_x, mid_y + 60, self.block_width, 
+                                   self.block_height//2, text, 
+                                   "hardware", f"hw_{joint.name}")
+            self._hw_blocks[joint.name] = hw_block
+            self.drawable_blocks.append(hw_block)
+        else:
+            hw_block.x = mid_x
+            hw_block.y = mid_y + 60
+            hw_block.text = text
+    
+    def _update_arrow_geometry(self, arrow):
+        """Work out an arrow's shortened line and midpoint in diagram coordinates.
+        
+        Drawing only offsets these, so this runs when an end moves rather than every frame.
+        """
+        # Calculate shortened line (to avoid overlapping with blocks)
+        dx = arrow.end_x - arrow.start_x
+        dy = arrow.end_y - arrow.start_y
+        length = math.hypot(dx, dy)
+        
+        # Arrows whose ends coincide have no direction and aren't drawn
+        if length == 0:
+            arrow.line = None
+            arrow.head = None
+            return
+        dx, dy = dx/length, dy/length
+        
+        # Shorten the line; the results are whole numbers, so offsetting them later is exact
+        start_x = arrow.start_x + dx * self.block_width//2
+        start_y = arrow.start_y + dy * self.block_height//2
+        end_x = arrow.end_x - dx * self.block_width//2
+        end_y = arrow.end_y - dy * self.block_height//2
+        arrow.line = (start_x, start_y, end_x, end_y, dx, dy,
+                      int((start_x + end_x) // 2), int((start_y + end_y) // 2))
+        arrow.head = self._arrowhead_points(end_x, end_y, dx, dy)
+    
+    def _update_arrow_labels(self, arrow):
+        """Render the joint info drawn at an arrow's midpoint and place each line relative to it."""
+        joint = arrow.joint_obj
+        color = self._joint_colors.get(joint.joint_type, self.COLORS['default_joint'])
+        
+        lines = [(f"{joint.name} ({joint.joint_type})", color, -15)]
+        
+        # Interface info
+        y_offset = 5
+        if joint.state_interfaces:
+            lines.append((f"State: {', '.join(joint.state_interfaces)}", color, y_offset))
+            y_offset += 15
+        if joint.command_interfaces:
+            lines.append((f"Cmd: {', '.join(joint.command_interfaces)}", color, y_offset))
+            y_offset += 15
+        if joint.hardware_interfaces:
+            lines.append((f"Hardware: {', '.join(joint.hardware_interfaces)}", self.COLORS['hw_text'], y_offset))
+        
+        arrow.labels = []
+        for text, text_color, center_y in lines:
+            text_surface = self._label_surface(text, text_color)
+            width, height = text_surface.get_size()
+            # Top-left of the text when centred at (0, center_y), as get_rect(center=...) places it
+            arrow.labels.append((text_surface, -(width // 2), center_y - height // 2))
+        arrow.label_box = (min(x for _, x, _ in arrow.labels),
+                           min(y for _, _, y in arrow.labels),
+                           max(x + surface.get_width() for surface, x, _ in arrow.labels),
+                           max(y + surface.get_height() for surface, _, y in arrow.labels))
     
     def _calculate_layout(self):
         """Calculate the positions of links in the diagram."""
         # Find the root links (links that are not a child in any joint)
-        child_links = set(joint.child for joint in self.joints)
-        root_links = [link for link in self.links if link not in child_links]
+        root_links = [link for link in self.links if link not in self.child_link_set]
         
         if not root_links and self.links:
             # If no root found, just use the first link
-            root_links = [list(self.links.keys())[0]]
+            root_links = [next(iter(self.links))]
         
-        # Use a tree layout algorithm (simple version)
+        # Use a tree layout algorithm (simple version), walking each tree depth-first
         for i, root in enumerate(root_links):
-            self._layout_subtree(root, 0, i * self.spacing_y * 2)
-    
-    def _layout_subtree(self, link_name, depth, y_offset):
-        """Recursively layout a subtree starting at the given link."""
-        # Skip if this link already has a position
-        if link_name in self.layout:
-            return
-            
-        # Position this link
-        x = self.margin + depth * self.spacing_x
-        y = self.margin + y_offset
-        self.layout[link_name] = (x, y)
-        
-        # Find all children of this link
-        children = []
-        for joint in self.joints:
-            if joint.parent == link_name:
-                children.append((joint.child, joint))
-        
-        # Layout each child subtree
-        for i, (child, _) in enumerate(children):
-            child_y_offset = y_offset + i * self.spacing_y
-            self._layout_subtree(child, depth + 1, child_y_offset)
+            stack = [(root, 0, i * self.spacing_y * 2)]
+            while stack:
+                link_name, depth, y_offset = stack.pop()
+                # Skip if this link already has a position
+                if link_name in self.layout:
+                    continue
+                self.layout[link_name] = (self.margin + depth * self.spacing_x, self.margin + y_offset)
+                # Pushed last child first, so children are visited in joint order
+                children = self.parent_to_joints.get(link_name, ())
+                for j in range(len(children) - 1, -1, -1):
+                    stack.append((children[j].child, depth + 1, y_offset + j * self.spacing_y))
     
     def reset_layout(self):
         """Reset the layout to the automatic tree layout."""
@@ -502,27 +778,19 @@ class URDFBlockDiagramApp:
             self.status_text = "No diagram to export"
             return
         
-        # Create a temporary tkinter root for file dialog
-        root = tk.Tk()
-        root.withdraw()
-        
         filename = filedialog.asksaveasfilename(
+            parent=self._dialog_parent(),
             defaultextension=".png",
             filetypes=[("PNG files", "*.png"), ("All files", "*.*")]
         )
         
-        root.destroy()
-        
         if filename:
             # Create a surface with the diagram bounds
-            min_x = min_y = float('inf')
-            max_x = max_y = float('-inf')
-            
-            for block in self.drawable_blocks:
-                min_x = min(min_x, block.x - block.width//2)
-                max_x = max(max_x, block.x + block.width//2)
-                min_y = min(min_y, block.y - block.height//2)
-                max_y = max(max_y, block.y + block.height//2)
+            blocks = self.drawable_blocks
+            min_x = min([block.x - block.width//2 for block in blocks])
+            max_x = max([block.x + block.width//2 for block in blocks])
+            min_y = min([block.y - block.height//2 for block in blocks])
+            max_y = max([block.y + block.height//2 for block in blocks])
             
             # Add some padding
             padding = 50
@@ -557,15 +825,7 @@ class URDFBlockDiagramApp:
         rect = pygame.Rect(x - block.width//2, y - block.height//2, 
                           block.width, block.height)
         
-        if block.block_type == "link":
-            color = self.COLORS['link_fill']
-            outline_color = self.COLORS['link_outline']
-        elif block.block_type == "hardware":
-            color = self.COLORS['hw_fill']
-            outline_color = self.COLORS['hw_outline']
-        else:
-            color = self.COLORS['joint_fill']
-            outline_color = self.COLORS['joint_outline']
+        color, outline_color = self._block_colors.get(block.block_type, self._default_block_colors)
         
         pygame.draw.rect(surface, color, rect)
         pygame.draw.rect(surface, outline_color, rect, 2)
@@ -575,77 +835,31 @@ class URDFBlockDiagramApp:
     
     def _draw_arrow_on_surface(self, surface, arrow, offset_x, offset_y):
         """Draw an arrow on the given surface with offset."""
-        start_x = arrow.start_x + offset_x
-        start_y = arrow.start_y + offset_y
-        end_x = arrow.end_x + offset_x
-        end_y = arrow.end_y + offset_y
-        
-        joint = arrow.joint_obj
+        if arrow.line is None:
+            return
+        start_x, start_y, end_x, end_y, dx, dy, mid_x, mid_y = arrow.line
+        start_x += offset_x
+        start_y += offset_y
+        end_x += offset_x
+        end_y += offset_y
         
         # Get color based on joint type
-        if joint.joint_type == "revolute":
-            color = self.COLORS['revolute']
-        elif joint.joint_type == "prismatic":
-            color = self.COLORS['prismatic']
-        elif joint.joint_type == "fixed":
-            color = self.COLORS['fixed']
-        else:
-            color = self.COLORS['default_joint']
+        color = self._joint_colors.get(arrow.joint_obj.joint_type, self.COLORS['default_joint'])
         
-        # Calculate shortened line (to avoid overlapping with blocks)
-        dx = end_x - start_x
-        dy = end_y - start_y
-        length = math.sqrt(dx*dx + dy*dy)
+        # Draw line
+        pygame.draw.line(surface, color, (start_x, start_y), (end_x, end_y), 3)
         
-        if length > 0:
-            dx, dy = dx/length, dy/length
-            
-            # Shorten the line
-            start_x += dx * self.block_width//2
-            start_y += dy * self.block_height//2
-            end_x -= dx * self.block_width//2
-            end_y -= dy * self.block_height//2
-            
-            # Draw line
-            pygame.draw.line(surface, color, (start_x, start_y), (end_x, end_y), 3)
-            
-            # Draw arrowhead
-            self._draw_arrowhead_on_surface(surface, end_x, end_y, dx, dy, color)
-            
-            # Draw joint info
-            mid_x = (start_x + end_x) // 2
-            mid_y = (start_y + end_y) // 2
-            
-            joint_text = f"{joint.name} ({joint.joint_type})"
-            text_surface = self.small_font.render(joint_text, True, color)
-            text_rect = text_surface.get_rect(center=(mid_x, mid_y - 15))
-            surface.blit(text_surface, text_rect)
-            
-            # Draw interface info
-            y_offset = 5
-            if joint.state_interfaces:
-                state_text = f"State: {', '.join(joint.state_interfaces)}"
-                text_surface = self.small_font.render(state_text, True, color)
-                text_rect = text_surface.get_rect(center=(mid_x, mid_y + y_offset))
-                surface.blit(text_surface, text_rect)
-                y_offset += 15
-            
-            if joint.command_interfaces:
-                cmd_text = f"Cmd: {', '.join(joint.command_interfaces)}"
-                text_surface = self.small_font.render(cmd_text, True, color)
-                text_rect = text_surface.get_rect(center=(mid_x, mid_y + y_offset))
-                surface.blit(text_surface, text_rect)
-                y_offset += 15
-            
-            if joint.hardware_interfaces:
-                hw_text = f"Hardware: {', '.join(joint.hardware_interfaces)}"
-                text_surface = self.small_font.render(hw_text, True, self.COLORS['hw_text'])
-                text_rect = text_surface.get_rect(center=(mid_x, mid_y + y_offset))
-                surface.blit(text_surface, text_rect)
+        # Draw arrowhead
+        self._draw_arrowhead_on_surface(surface, end_x, end_y, dx, dy, color)
+        
+        # Draw joint info
+        mid_x += offset_x
+        mid_y += offset_y
+        surface.blits([(text_surface, (mid_x + x, mid_y + y)) for text_surface, x, y in arrow.labels],
+                      doreturn=False)
     
-    def _draw_arrowhead_on_surface(self, surface, x, y, dx, dy, color):
-        """Draw an arrowhead on the given surface."""
-        # Calculate arrowhead points
+    def _arrowhead_points(self, x, y, dx, dy):
+        """Get the corners of an arrowhead pointing along (dx, dy) with its tip at (x, y)."""
         arrow_length = 15
         arrow_angle = 0.5
         
@@ -658,64 +872,56 @@ class URDFBlockDiagramApp:
         p1_y = y - dy * arrow_length + perp_y * arrow_length * arrow_angle
         p2_x = x - dx * arrow_length - perp_x * arrow_length * arrow_angle
         p2_y = y - dy * arrow_length - perp_y * arrow_length * arrow_angle
-        
-        # Draw arrowhead
-        pygame.draw.polygon(surface, color, [(x, y), (p1_x, p1_y), (p2_x, p2_y)])
+        return [(x, y), (p1_x, p1_y), (p2_x, p2_y)]
+    
+    def _draw_arrowhead_on_surface(self, surface, x, y, dx, dy, color):
+        """Draw an arrowhead on the given surface."""
+        pygame.draw.polygon(surface, color, self._arrowhead_points(x, y, dx, dy))
     
     def _draw_text_on_surface(self, surface, text, x, y, max_width):
         """Draw text on the given surface with word wrapping."""
-        words = text.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if self.small_font.size(test_line)[0] <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-        
-        if current_line:
-            lines.append(current_line)
-        
-        # Draw lines
-        line_height = self.small_font.get_height()
-        total_height = len(lines) * line_height
-        start_y = y - total_height // 2
-        
-        for i, line in enumerate(lines):
-            text_surface = self.small_font.render(line, True, self.COLORS['text'])
-            text_rect = text_surface.get_rect(center=(x, start_y + i * line_height + line_height // 2))
-            surface.blit(text_surface, text_rect)
+        surface.blits([(text_surface, text_surface.get_rect(center=(x, y + dy)))
+                       for text_surface, dy in self._text_lines(text, max_width)], doreturn=False)
     
     def handle_events(self):
-        """Handle pygame events."""
+        """Handle the pending pygame events. Returns False once the window is closed."""
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+            if not self.handle_event(event):
                 return False
-            
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left click
-                    self._handle_left_click(event.pos)
-                elif event.button == 3:  # Right click
-                    self._handle_right_click(event.pos)
-            
-            elif event.type == pygame.MOUSEBUTTONUP:
-                if event.button == 1:  # Left click release
-                    self._handle_left_release()
-            
-            elif event.type == pygame.MOUSEMOTION:
-                self._handle_mouse_motion(event.pos, event.rel)
-            
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r and pygame.key.get_pressed()[pygame.K_LCTRL]:
-                    self.reset_layout()
-                elif event.key == pygame.K_o and pygame.key.get_pressed()[pygame.K_LCTRL]:
-                    self.open_urdf()
-                elif event.key == pygame.K_s and pygame.key.get_pressed()[pygame.K_LCTRL]:
-                    self.export_diagram()
+        return True
+    
+    def handle_event(self, event):
+        """Handle one pygame event. Returns False if it closes the window."""
+        # Any event besides motion (input, window exposure, focus) may change what should
+        # be on screen; _handle_mouse_motion decides for itself
+        if event.type != pygame.MOUSEMOTION:
+            self._needs_redraw = True
+            self._drag_background = None
+        
+        if event.type == pygame.QUIT:
+            return False
+        
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self._update_hover(event.pos)
+            if event.button == 1:  # Left click
+                self._handle_left_click(event.pos)
+            elif event.button == 3:  # Right click
+                self._handle_right_click(event.pos)
+        
+        elif event.type == pygame.MOUSEBUTTONUP:
+            if event.button == 1:  # Left click release
+                self._handle_left_release()
+        
+        elif event.type == pygame.MOUSEMOTION:
+            self._handle_mouse_motion(event.pos, event.rel)
+        
+        elif event.type == pygame.KEYDOWN and event.mod & pygame.KMOD_CTRL:
+            if event.key == pygame.K_r:
+                self.reset_layout()
+            elif event.key == pygame.K_o:
+                self.open_urdf()
+            elif event.key == pygame.K_s:
+                self.export_diagram()
         
         return True
     
@@ -733,14 +939,16 @@ class URDFBlockDiagramApp:
         world_x = mouse_x + self.camera_x
         world_y = mouse_y + self.camera_y
         
-        # Check if clicking on a draggable block
-        for block in self.drawable_blocks:
-            if block.block_type == "link" and block.contains_point(world_x, world_y):
-                self.dragging_block = block
-                self.drag_offset_x = world_x - block.x
-                self.drag_offset_y = world_y - block.y
-                block.selected = True
-                break
+        # Check if clicking on a draggable block; only those sharing the clicked grid cell can be hit
+        cell = (world_x // self.spacing_x, world_y // self.spacing_x)
+        hits = [block for block in self._block_grid.get(cell, ()) if block.contains_point(world_x, world_y)]
+        if hits:
+            # Where blocks overlap, the first one in the diagram wins
+            block = min(hits, key=lambda b: self._link_rank[b.link_name])
+            self.dragging_block = block
+            self.drag_offset_x = world_x - block.x
+            self.drag_offset_y = world_y - block.y
+            block.selected = True
         else:
             # Clear selection if not clicking on a block
             for block in self.drawable_blocks:
@@ -748,12 +956,29 @@ class URDFBlockDiagramApp:
     
     def _handle_left_release(self):
         """Handle left mouse button release."""
+        self._drag_background = None
         if self.dragging_block:
             # Update layout with new position
-            if self.dragging_block.link_name and self.dragging_block.link_name in self.layout:
-                self.layout[self.dragging_block.link_name] = (self.dragging_block.x, self.dragging_block.y)
-                # Regenerate arrows to match new positions
-                self._create_arrows()
+            block = self.dragging_block
+            name = block.link_name
+            if name and name in self.layout:
+                # Move the block to the grid cells of its new position
+                for cell in self._grid_cells(*self.layout[name], block):
+                    self._block_grid[cell].remove(block)
+                for cell in self._grid_cells(block.x, block.y, block):
+                    self._block_grid.setdefault(cell, []).append(block)
+                self.layout[name] = (block.x, block.y)
+                # Only the arrows touching the moved link need new endpoints
+                for index in self._arrows_by_link.get(name, ()):
+                    arrow = self.drawable_arrows[index]
+                    if arrow.joint_obj.parent == name:
+                        arrow.start_x, arrow.start_y = block.x, block.y
+                    if arrow.joint_obj.child == name:
+                        arrow.end_x, arrow.end_y = block.x, block.y
+                    if self._arrow_coords is not None:
+                        self._arrow_coords[index] = (arrow.start_x, arrow.start_y, arrow.end_x, arrow.end_y)
+                    self._update_arrow_geometry(arrow)
+                    self._update_hardware_block(arrow)
             
             self.dragging_block = None
     
@@ -766,10 +991,31 @@ class URDFBlockDiagramApp:
         world_y = mouse_y + self.camera_y
         
         # Check if right-clicking on an arrow (joint)
-        for arrow in self.drawable_arrows:
-            if arrow.contains_point(world_x, world_y):
-                self._add_hardware_interface(arrow.joint_obj)
-                break
+        arrow = self._arrow_at(world_x, world_y)
+        if arrow is not None:
+            self._add_hardware_interface(arrow.joint_obj)
+    
+    def _arrow_at(self, x, y):
+        """Return the first arrow within ARROW_HIT_DISTANCE of the point, or None."""
+        coords = self._arrow_coords
+        if coords is None:
+            for arrow in self.drawable_arrows:
+                if arrow.contains_point(x, y):
+                    return arrow
+            return None
+        
+        # Same test as DrawableArrow.contains_point, for all arrows at once and without the sqrt
+        starts = coords[:, :2]
+        seg = coords[:, 2:] - starts
+        rel = np.array((x, y), dtype=np.float64) - starts
+        len_sq = (seg * seg).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            param = np.clip((seg * rel).sum(axis=1) / len_sq, 0.0, 1.0)
+        offset = rel - param[:, None] * seg
+        dist_sq = (offset * offset).sum(axis=1)
+        # Zero-length arrows are never hit
+        hits = np.flatnonzero((dist_sq <= ARROW_HIT_DISTANCE * ARROW_HIT_DISTANCE) & (len_sq != 0))
+        return self.drawable_arrows[hits[0]] if hits.size else None
     
     def _handle_mouse_motion(self, pos, rel):
         """Handle mouse motion."""
@@ -783,9 +1029,21 @@ class URDFBlockDiagramApp:
             # Move the block
             self.dragging_block.x = world_x - self.drag_offset_x
             self.dragging_block.y = world_y - self.drag_offset_y
+            self._needs_redraw = True
         
+        self._update_hover(pos)
         self.last_mouse_x, self.last_mouse_y = mouse_x, mouse_y
     
+    def _update_hover(self, pos):
+        """Track which button the pointer is over; _draw_ui() reads this rather than polling the mouse."""
+        hover = next((button for button in self.buttons if button['rect'].collidepoint(pos)), None)
+        if hover is not self._hover_button:
+            # Without a full redraw only the buttons the pointer moved onto or off need repainting
+            for button in (self._hover_button, hover):
+                if button is not None:
+                    self._dirty_rects.append(button['rect'])
+            self._hover_button = hover
+    
     def _handle_button_click(self, action):
         """Handle button click."""
         if action == 'open_urdf':
@@ -797,41 +1055,59 @@ class URDFBlockDiagramApp:
     
     def _add_hardware_interface(self, joint):
         """Add hardware interface to a joint."""
-        # Create a temporary tkinter root for input dialog
-        root = tk.Tk()
-        root.withdraw()
-        
         current_interfaces = ", ".join(joint.hardware_interfaces) if joint.hardware_interfaces else ""
         
         hw_interface = simpledialog.askstring(
             "Add Hardware Interface",
             f"Enter hardware interface for joint {joint.name}:",
-            initialvalue=current_interfaces
+            initialvalue=current_interfaces,
+            parent=self._dialog_parent()
         )
         
-        root.destroy()
-        
         if hw_interface:
             # Update the joint's hardware interfaces
             joint.hardware_interfaces = [iface.strip() for iface in hw_interface.split(",") if iface.strip()]
             
-            # Regenerate the diagram
-            self._create_arrows()
+            # Update the joint's hardware interface block
+            for index in self._arrows_by_link.get(joint.parent, ()):
+                arrow = self.drawable_arrows[index]
+                if arrow.joint_obj is joint:
+                    self._update_arrow_labels(arrow)
+                    self._update_hardware_block(arrow)
             
             self.status_text = f"Added hardware interface to {joint.name}: {hw_interface}"
     
     def draw(self):
         """Draw the entire application."""
-        # Clear screen
-        self.screen.fill(self.COLORS['background'])
-        
-        # Draw arrows first (so they appear behind blocks)
-        for arrow in self.drawable_arrows:
-            self._draw_arrow(arrow)
-        
-        # Draw blocks
-        for block in self.drawable_blocks:
-            self._draw_block(block)
+        blocks = self.drawable_blocks
+        if self._drag_background is not None:
+            # Only the dragged block moves during a drag, so everything under it is reused
+            self.screen.blit(self._drag_background, (0, 0))
+            blocks = blocks[self._drag_index:]
+        else:
+            # Clear screen
+            self.screen.fill(self.COLORS['background'])
+            
+            # Draw arrows first (so they appear behind blocks)
+            for arrow in self.drawable_arrows:
+                self._draw_arrow(arrow)
+            
+            if self.dragging_block is not None:
+                # Keep what is drawn under the dragged block for the rest of the drag
+                index = blocks.index(self.dragging_block)
+                batch = []
+                for block in blocks[:index]:
+                    self._draw_block(block, batch)
+                self.screen.blits(batch, doreturn=False)
+                self._drag_background = self.screen.copy()
+                self._drag_index = index
+                blocks = blocks[index:]
+        
+        # Draw blocks, blitting the pre-rendered ones in one call
+        batch = []
+        for block in blocks:
+            self._draw_block(block, batch)
+        self.screen.blits(batch, doreturn=False)
         
         # Draw UI
         self._draw_ui()
@@ -841,8 +1117,8 @@ class URDFBlockDiagramApp:
         
         pygame.display.flip()
     
-    def _draw_block(self, block):
-        """Draw a single block."""
+    def _draw_block(self, block, batch):
+        """Draw a single block, or queue it in batch for Surface.blits() if it is pre-rendered."""
         # Apply camera transformation
         screen_x = block.x - self.camera_x
         screen_y = block.y - self.camera_y
@@ -855,118 +1131,105 @@ class URDFBlockDiagramApp:
         rect = pygame.Rect(screen_x - block.width//2, screen_y - block.height//2, 
                           block.width, block.height)
         
-        if block.block_type == "link":
-            color = self.COLORS['link_fill']
-            outline_color = self.COLORS['link_outline']
-        elif block.block_type == "hardware":
-            color = self.COLORS['hw_fill']
-            outline_color = self.COLORS['hw_outline']
-        else:
-            color = self.COLORS['joint_fill']
-            outline_color = self.COLORS['joint_outline']
+        cached = self._block_surface(block)
+        if cached is not None:
+            batch.append((cached, rect))
+            return
         
-        # Draw block
-        pygame.draw.rect(self.screen, color, rect)
+        # This one is drawn straight away, so the blocks queued before it have to go first
+        if batch:
+            self.screen.blits(batch, doreturn=False)
+            batch.clear()
         
-        # Draw outline (thicker if selected)
-        outline_width = 3 if block.selected else 2
-        pygame.draw.rect(self.screen, outline_color, rect, outline_width)
+        # Draw block and outline
+        self.screen.blit(self._block_chrome(block), rect)
         
         # Draw text
         self._draw_wrapped_text(block.text, screen_x, screen_y, block.width - 10)
     
+    def _block_surface(self, block):
+        """Return the block rendered at its own size, or None if its text doesn't fit inside it.
+        
+        Rendered once per text, type, size and selection state; text that overflows the
+        block is left to the direct drawing path.
+        """
+        key = (block.text, block.block_type, block.width, block.height, block.selected)
+        if key in self._block_surf_cache:
+            return self._block_surf_cache[key]
+        
+        surface = self._block_chrome(block).copy()
+        rect = surface.get_rect()
+        
+        # Same placement as _draw_wrapped_text, relative to the block
+        for text_surface, dy in self._text_lines(block.text, block.width - 10):
+            text_rect = text_surface.get_rect(center=(rect.centerx, rect.centery + dy))
+            if not rect.contains(text_rect):
+                surface = None
+                break
+            surface.blit(text_surface, text_rect)
+        
+        self._block_surf_cache[key] = surface
+        return surface
+    
+    def _block_chrome(self, block):
+        """Return the block's fill and outline without text, rendered once per type, size and selection state."""
+        key = (block.block_type, block.width, block.height, block.selected)
+        surface = self._chrome_cache.get(key)
+        if surface is None:
+            color, outline_color = self._block_colors.get(block.block_type, self._default_block_colors)
+            surface = self._chrome_cache[key] = pygame.Surface((block.width, block.height)).convert()
+            rect = surface.get_rect()
+            pygame.draw.rect(surface, color, rect)
+            # Thicker outline if selected
+            pygame.draw.rect(surface, outline_color, rect, 3 if block.selected else 2)
+        return surface
+    
+    def _label_surface(self, text, color):
+        """Return the rendered arrow label text, rendering it only the first time."""
+        key = (text, color)
+        surface = self._label_cache.get(key)
+        if surface is None:
+            surface = self._label_cache[key] = self.small_font.render(text, True, color).convert_alpha()
+        return surface
+    
     def _draw_arrow(self, arrow):
         """Draw a single arrow."""
-        # Apply camera transformation
-        start_x = arrow.start_x - self.camera_x
-        start_y = arrow.start_y - self.camera_y
-        end_x = arrow.end_x - self.camera_x
-        end_y = arrow.end_y - self.camera_y
+        if arrow.line is None:
+            return
+        start_x, start_y, end_x, end_y, dx, dy, mid_x, mid_y = arrow.line
         
-        joint = arrow.joint_obj
+        # Apply camera transformation
+        start_x -= self.camera_x
+        start_y -= self.camera_y
+        end_x -= self.camera_x
+        end_y -= self.camera_y
         
         # Get color based on joint type
-        if joint.joint_type == "revolute":
-            color = self.COLORS['revolute']
-        elif joint.joint_type == "prismatic":
-            color = self.COLORS['prismatic']
-        elif joint.joint_type == "fixed":
-            color = self.COLORS['fixed']
-        else:
-            color = self.COLORS['default_joint']
-        
-        # Calculate shortened line (to avoid overlapping with blocks)
-        dx = end_x - start_x
-        dy = end_y - start_y
-        length = math.sqrt(dx*dx + dy*dy)
+        color = self._joint_colors.get(arrow.joint_obj.joint_type, self.COLORS['default_joint'])
         
-        if length > 0:
-            dx, dy = dx/length, dy/length
-            
-            # Shorten the line
-            start_x += dx * self.block_width//2
-            start_y += dy * self.block_height//2
-            end_x -= dx * self.block_width//2
-            end_y -= dy * self.block_height//2
-            
-            # Draw line
+        # Draw line and arrowhead, unless both are off screen (the head is within 8px of the line)
+        if (max(start_x, end_x) >= -ARROW_CULL_MARGIN and min(start_x, end_x) <= self.SCREEN_WIDTH + ARROW_CULL_MARGIN and
+                max(start_y, end_y) >= -ARROW_CULL_MARGIN and min(start_y, end_y) <= self.SCREEN_HEIGHT + ARROW_CULL_MARGIN):
             pygame.draw.line(self.screen, color, (start_x, start_y), (end_x, end_y), 3)
-            
-            # Draw arrowhead
-            self._draw_arrowhead(end_x, end_y, dx, dy, color)
-            
-            # Draw joint info
-            mid_x = (start_x + end_x) // 2
-            mid_y = (start_y + end_y) // 2
-            
-            joint_text = f"{joint.name} ({joint.joint_type})"
-            text_surface = self.small_font.render(joint_text, True, color)
-            text_rect = text_surface.get_rect(center=(mid_x, mid_y - 15))
-            self.screen.blit(text_surface, text_rect)
-            
-            # Draw interface info
-            y_offset = 5
-            if joint.state_interfaces:
-                state_text = f"State: {', '.join(joint.state_interfaces)}"
-                text_surface = self.small_font.render(state_text, True, color)
-                text_rect = text_surface.get_rect(center=(mid_x, mid_y + y_offset))
-                self.screen.blit(text_surface, text_rect)
-                y_offset += 15
-            
-            if joint.command_interfaces:
-                cmd_text = f"Cmd: {', '.join(joint.command_interfaces)}"
-                text_surface = self.small_font.render(cmd_text, True, color)
-                text_rect = text_surface.get_rect(center=(mid_x, mid_y + y_offset))
-                self.screen.blit(text_surface, text_rect)
-                y_offset += 15
-            
-            if joint.hardware_interfaces:
-                hw_text = f"Hardware: {', '.join(joint.hardware_interfaces)}"
-                text_surface = self.small_font.render(hw_text, True, self.COLORS['hw_text'])
-                text_rect = text_surface.get_rect(center=(mid_x, mid_y + y_offset))
-                self.screen.blit(text_surface, text_rect)
-    
-    def _draw_arrowhead(self, x, y, dx, dy, color):
-        """Draw an arrowhead."""
-        # Calculate arrowhead points
-        arrow_length = 15
-        arrow_angle = 0.5
-        
-        # Calculate perpendicular vector
-        perp_x = -dy
-        perp_y = dx
-        
-        # Calculate arrowhead points
-        p1_x = x - dx * arrow_length + perp_x * arrow_length * arrow_angle
-        p1_y = y - dy * arrow_length + perp_y * arrow_length * arrow_angle
-        p2_x = x - dx * arrow_length - perp_x * arrow_length * arrow_angle
-        p2_y = y - dy * arrow_length - perp_y * arrow_length * arrow_angle
-        
-        # Draw arrowhead
-        pygame.draw.polygon(self.screen, color, [(x, y), (p1_x, p1_y), (p2_x, p2_y)])
+            # The arrowhead's corners are worked out with the line; only a moved camera needs them offset
+            if self.camera_x or self.camera_y:
+                head = [(x - self.camera_x, y - self.camera_y) for x, y in arrow.head]
+            else:
+                head = arrow.head
+            pygame.draw.polygon(self.screen, color, head)
+        
+        # Draw joint info, unless all of it is off screen
+        mid_x -= self.camera_x
+        mid_y -= self.camera_y
+        left, top, right, bottom = arrow.label_box
+        if (mid_x + right > 0 and mid_x + left < self.SCREEN_WIDTH and
+                mid_y + bottom > 0 and mid_y + top < self.SCREEN_HEIGHT):
+            # One call for all of the arrow's lines; the next arrow's line may cover them, so they can't wait
+            self.screen.blits([(text_surface, (mid_x + x, mid_y + y)) for text_surface, x, y in arrow.labels],
+                              doreturn=False)
     
-    def _draw_wrapped_text(self, text, x, y, max_width):
-        """Draw text with word wrapping."""
+    def _wrap_text(self, text, max_width):
+        """Split text into lines no wider than max_width, breaking between words."""
         words = text.split()
         lines = []
         current_line = ""
@@ -983,48 +1246,68 @@ class URDFBlockDiagramApp:
         if current_line:
             lines.append(current_line)
         
-        # Draw lines
-        line_height = self.small_font.get_height()
-        total_height = len(lines) * line_height
-        start_y = y - total_height // 2
-        
-        for i, line in enumerate(lines):
-            text_surface = self.small_font.render(line, True, self.COLORS['text'])
-            text_rect = text_surface.get_rect(center=(x, start_y + i * line_height + line_height // 2))
-            self.screen.blit(text_surface, text_rect)
+        return lines
+    
+    def _text_lines(self, text, max_width):
+        """Return the rendered lines of wrapped text, each with its centre's offset from the text's centre.
+        
+        Wrapping and rendering happen once per (text, max_width).
+        """
+        key = (text, max_width)
+        lines = self._wrap_cache.get(key)
+        if lines is None:
+            wrapped = self._wrap_text(text, max_width)
+            line_height = self.small_font.get_height()
+            top = -(len(wrapped) * line_height // 2)
+            lines = self._wrap_cache[key] = [
+                (self.small_font.render(line, True, self.COLORS['text']).convert_alpha(),
+                 top + i * line_height + line_height // 2)
+                for i, line in enumerate(wrapped)
+            ]
+        return lines
+    
+    def _draw_wrapped_text(self, text, x, y, max_width):
+        """Draw text with word wrapping."""
+        self.screen.blits([(text_surface, text_surface.get_rect(center=(x, y + dy)))
+                           for text_surface, dy in self._text_lines(text, max_width)], doreturn=False)
     
     def _draw_ui(self):
         """Draw the UI elements."""
-        # Draw buttons
-        mouse_pos = pygame.mouse.get_pos()
-        
+        # Draw buttons, highlighting the one under the pointer
         for button in self.buttons:
-            # Check if mouse is over button
-            is_hover = button['rect'].collidepoint(mouse_pos)
-            color = self.COLORS['button_hover'] if is_hover else self.COLORS['button']
-            
-            pygame.draw.rect(self.screen, color, button['rect'])
-            pygame.draw.rect(self.screen, self.COLORS['button_text'], button['rect'], 2)
-            
-            # Draw button text
-            text_surface = self.button_font.render(button['text'], True, self.COLORS['button_text'])
-            text_rect = text_surface.get_rect(center=button['rect'].center)
-            self.screen.blit(text_surface, text_rect)
+            is_hover = button is self._hover_button
+            self.screen.blit(button['surf_hover'] if is_hover else button['surf_normal'], button['rect'])
     
     def _draw_status(self):
         """Draw the status bar."""
-        status_surface = self.font.render(self.status_text, True, self.COLORS['text'])
-        self.screen.blit(status_surface, (10, self.SCREEN_HEIGHT - 30))
+        # Rendered again only when the text has changed
+        if self._status_cache[0] != self.status_text:
+            self._status_cache = (self.status_text,
+                                  self.font.render(self.status_text, True, self.COLORS['text']).convert_alpha())
+        self.screen.blit(self._status_cache[1], (10, self.SCREEN_HEIGHT - 30))
     
     def run(self):
         """Main game loop."""
         running = True
         
         while running:
-            running = self.handle_events()
-            self.draw()
-            self.clock.tick(60)  # 60 FPS
+            # Only repaint what the events since the last frame changed
+            if self._needs_redraw:
+                self.draw()
+                self._needs_redraw = False
+                self._dirty_rects.clear()
+            elif self._dirty_rects:
+                # Buttons are opaque, so drawing them over the last frame is enough
+                self._draw_ui()
+                pygame.display.update(self._dirty_rects)
+                self._dirty_rects.clear()
+            self.clock.tick(60)  # At most 60 FPS, e.g. while dragging
+            
+            # Nothing on screen changes by itself, so sleep until the next event rather than polling
+            running = self.handle_event(pygame.event.wait()) and self.handle_events()
         
+        if self._tk_root is not None:
+            self._tk_root.destroy()
         pygame.quit()
 
 